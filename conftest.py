@@ -0,0 +1,16 @@
+"""
+pytest 根配置
+smartui_fixed 包初始化時會導入 psycopg2/redis 並創建連接數據庫的全局實例，
+收集其下的單元測試時只註冊包路徑，不執行包的 __init__
+"""
+
+import os
+import sys
+import types
+
+_SMARTUI_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "smartui_fixed")
+
+if "smartui_fixed" not in sys.modules:
+    _smartui_package = types.ModuleType("smartui_fixed")
+    _smartui_package.__path__ = [_SMARTUI_DIR]
+    sys.modules["smartui_fixed"] = _smartui_package
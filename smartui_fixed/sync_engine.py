@@ -67,6 +67,35 @@ class SmartSyncEngine:
         self._log_sync_record(sync_record)
         logger.info(f"添加同步記錄: {table_name}.{record_id} ({action})")
     
+    def add_sync_records(self, records: List[tuple]):
+        """批量添加同步記錄（單一事務寫入同步日誌）
+        
+        每條記錄為 (table_name, record_id, action, data, timestamp)，timestamp
+        為記錄入隊時間，保證同一批次內記錄的先後順序；缺省時使用當前時間。
+        同步日誌寫入失敗時不會加入同步隊列，調用方可以整批重試。
+        """
+        if not records:
+            return
+        
+        now = datetime.now()
+        sync_records = [
+            SyncRecord(
+                table_name=record[0],
+                record_id=record[1],
+                action=record[2],
+                data=record[3],
+                timestamp=record[4] if len(record) > 4 else now
+            )
+            for record in records
+        ]
+        
+        self._log_sync_records(sync_records)
+        
+        with self.sync_lock:
+            self.sync_queue.extend(sync_records)
+        
+        logger.info(f"批量添加同步記錄: {len(sync_records)} 條")
+    
     def _log_sync_record(self, record: SyncRecord):
         """記錄同步日誌到本地數據庫"""
         conn = self.db_manager.get_local_connection()
@@ -85,6 +114,25 @@ class SmartSyncEngine:
         ))
         conn.commit()
     
+    def _log_sync_records(self, records: List[SyncRecord]):
+        """批量記錄同步日誌到本地數據庫"""
+        conn = self.db_manager.get_local_connection()
+        with conn:
+            conn.executemany("""
+                INSERT INTO sync_log (table_name, record_id, action, data, sync_status, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, [
+                (
+                    record.table_name,
+                    record.record_id,
+                    record.action,
+                    json.dumps(record.data),
+                    record.sync_status,
+                    record.timestamp
+                )
+                for record in records
+            ])
+    
     def _sync_worker(self):
         """同步工作線程"""
         while self.is_running:
@@ -0,0 +1,226 @@
+"""
+工作流管理器單元測試
+使用內存SQLite數據庫驗證同步記錄的批量寫入與刷新
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+# 直接導入模塊，避免包初始化時連接PostgreSQL/Redis
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from sync_engine import SmartSyncEngine
+from workflow_manager import (
+    WorkflowManager, WorkflowStatus, WorkflowType, _plan_execution_waves
+)
+
+
+class InMemoryDBManager:
+    """只提供本地連接的內存數據庫管理器"""
+
+    def __init__(self):
+        self.sqlite_conn = sqlite3.connect(":memory:", check_same_thread=False)
+        self.sqlite_conn.row_factory = sqlite3.Row
+        self.sqlite_conn.executescript("""
+            CREATE TABLE workflows (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                project_id INTEGER NOT NULL,
+                name VARCHAR(100) NOT NULL,
+                type VARCHAR(50) NOT NULL,
+                config JSON,
+                status VARCHAR(20) DEFAULT 'active',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_sync TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            );
+            CREATE TABLE sync_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name VARCHAR(50) NOT NULL,
+                record_id INTEGER NOT NULL,
+                action VARCHAR(20) NOT NULL,
+                data JSON,
+                sync_status VARCHAR(20) DEFAULT 'pending',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                synced_at TIMESTAMP
+            );
+        """)
+
+    def get_local_connection(self):
+        return self.sqlite_conn
+
+    def get_cloud_connection(self):
+        return None
+
+
+class TestWorkflowSyncBatching(unittest.TestCase):
+    """同步記錄批量寫入測試"""
+
+    def setUp(self):
+        self.db_manager = InMemoryDBManager()
+        self.sync_engine = SmartSyncEngine(self.db_manager)
+        self.workflow_manager = WorkflowManager(self.db_manager)
+        self.workflow_manager.set_sync_engine(self.sync_engine)
+
+        workflow = self.workflow_manager.create_workflow(1, "測試工作流", WorkflowType.CODING)
+        self.workflow_id = workflow.id
+        self.workflow_manager.update_workflow_status(self.workflow_id, WorkflowStatus.ACTIVE)
+
+    def _sync_log_actions(self):
+        rows = self.db_manager.sqlite_conn.execute(
+            "SELECT action, data, created_at FROM sync_log ORDER BY id"
+        ).fetchall()
+        return [tuple(row) for row in rows]
+
+    def test_status_update_flushes_immediately(self):
+        """非執行期間的狀態更新立即寫入同步日誌"""
+        actions = [action for action, _, _ in self._sync_log_actions()]
+        self.assertEqual(actions, ["insert", "update"])
+
+    def test_execute_workflow_flushes_once(self):
+        """執行期間的狀態變更在結束時一次性寫入"""
+        with patch.object(self.sync_engine, "add_sync_records",
+                          wraps=self.sync_engine.add_sync_records) as add_sync_records:
+            self.assertTrue(self.workflow_manager.execute_workflow(self.workflow_id))
+
+        add_sync_records.assert_called_once()
+        records = add_sync_records.call_args.args[0]
+        self.assertEqual(
+            [record[3]["status"] for record in records],
+            [WorkflowStatus.RUNNING.value, WorkflowStatus.COMPLETED.value]
+        )
+
+    def test_batched_records_keep_enqueue_order(self):
+        """批量寫入的記錄保留各自的入隊時間"""
+        self.workflow_manager.execute_workflow(self.workflow_id)
+
+        running, completed = self._sync_log_actions()[-2:]
+        self.assertIn(WorkflowStatus.RUNNING.value, running[1])
+        self.assertIn(WorkflowStatus.COMPLETED.value, completed[1])
+        self.assertLess(datetime.fromisoformat(running[2]), datetime.fromisoformat(completed[2]))
+
+    def test_other_threads_are_not_deferred(self):
+        """執行期間其他線程的狀態更新不被延遲"""
+        flushed = []
+
+        def update_from_other_thread(step, workflow):
+            thread = threading.Thread(
+                target=self.workflow_manager.update_workflow_status,
+                args=(self.workflow_id, WorkflowStatus.PAUSED)
+            )
+            thread.start()
+            thread.join()
+            flushed.append(len(self._sync_log_actions()))
+            return True
+
+        before = len(self._sync_log_actions())
+        with patch.object(self.workflow_manager, "_execute_step",
+                          side_effect=update_from_other_thread):
+            self.workflow_manager.execute_workflow(self.workflow_id)
+
+        self.assertEqual(flushed[0], before + 1)
+
+    def test_failed_flush_is_retried(self):
+        """同步日誌寫入失敗時保留記錄並在下次刷新時重試"""
+        before = len(self._sync_log_actions())
+        queued = len(self.sync_engine.sync_queue)
+        with patch.object(self.sync_engine, "_log_sync_records",
+                          side_effect=sqlite3.OperationalError("database is locked")):
+            self.assertTrue(self.workflow_manager.execute_workflow(self.workflow_id))
+
+        self.assertEqual(len(self._sync_log_actions()), before)
+        self.assertEqual(len(self.workflow_manager._failed_sync), 2)
+        self.assertEqual(len(self.sync_engine.sync_queue), queued)
+
+        self.workflow_manager.update_workflow_status(self.workflow_id, WorkflowStatus.PAUSED)
+
+        self.assertEqual(self.workflow_manager._failed_sync, [])
+        statuses = [data for _, data, _ in self._sync_log_actions()[before:]]
+        self.assertEqual(len(statuses), 3)
+        self.assertIn(WorkflowStatus.RUNNING.value, statuses[0])
+        self.assertIn(WorkflowStatus.PAUSED.value, statuses[2])
+
+
+class TestWorkflowExecutionPlan(unittest.TestCase):
+    """步驟執行計劃測試"""
+
+    def setUp(self):
+        self.db_manager = InMemoryDBManager()
+        self.workflow_manager = WorkflowManager(self.db_manager)
+
+    def _steps(self, *graph):
+        return [
+            {"id": step_id, "name": step_id, "type": "test", "config": {}, "dependencies": list(deps)}
+            for step_id, deps in graph
+        ]
+
+    def test_steps_without_dependencies_keep_declaration_order(self):
+        """無依賴的步驟按聲明順序執行"""
+        self.assertEqual(_plan_execution_waves((("a", ()), ("b", ()), ("c", ()))), ((0, 1, 2),))
+
+    def test_dependencies_run_after_their_prerequisites(self):
+        """步驟在其依賴完成後才執行"""
+        waves = _plan_execution_waves((("build", ("prepare",)), ("prepare", ()), ("deploy", ("build",))))
+        self.assertEqual(waves, ((1,), (0,), (2,)))
+
+    def test_cycle_is_detected(self):
+        """循環依賴拋出 ValueError"""
+        with self.assertRaisesRegex(ValueError, "循環依賴"):
+            _plan_execution_waves((("a", ("b",)), ("b", ("a",))))
+
+    def test_unknown_dependency_is_reported(self):
+        """依賴不存在的步驟拋出 ValueError 而非被忽略"""
+        with self.assertRaisesRegex(ValueError, "zzz"):
+            _plan_execution_waves((("a", ("zzz",)),))
+
+    def test_repeated_step_ids_run_per_occurrence(self):
+        """重複的步驟ID按出現次數分別執行"""
+        self.assertEqual(_plan_execution_waves((("a", ()), ("b", ()), ("a", ()))), ((0, 1, 2),))
+
+    def test_plan_is_cached_per_step_graph(self):
+        """相同步驟圖復用緩存的執行計劃"""
+        graph = (("cache_a", ()), ("cache_b", ("cache_a",)))
+        _plan_execution_waves(graph)
+        hits = _plan_execution_waves.cache_info().hits
+        _plan_execution_waves(tuple(graph))
+        self.assertEqual(_plan_execution_waves.cache_info().hits, hits + 1)
+
+    def test_create_workflow_rejects_invalid_steps(self):
+        """創建工作流時拒絕重複ID、未知依賴和循環依賴"""
+        invalid_graphs = {
+            "duplicate": (("a", ()), ("a", ())),
+            "unknown": (("a", ("missing",)),),
+            "cycle": (("a", ("b",)), ("b", ("a",))),
+        }
+        for case, graph in invalid_graphs.items():
+            with self.subTest(case=case):
+                workflow = self.workflow_manager.create_workflow(
+                    1, case, WorkflowType.TESTING, custom_steps=self._steps(*graph)
+                )
+                self.assertIsNone(workflow)
+
+        count = self.db_manager.sqlite_conn.execute("SELECT COUNT(*) FROM workflows").fetchone()[0]
+        self.assertEqual(count, 0)
+
+    def test_execute_workflow_follows_dependencies(self):
+        """執行工作流時按依賴順序調用步驟"""
+        workflow = self.workflow_manager.create_workflow(
+            1, "依賴測試", WorkflowType.TESTING,
+            custom_steps=self._steps(("report", ("unit", "e2e")), ("unit", ()), ("e2e", ("unit",)))
+        )
+        self.workflow_manager.update_workflow_status(workflow.id, WorkflowStatus.ACTIVE)
+
+        executed = []
+        with patch.object(self.workflow_manager, "_execute_step",
+                          side_effect=lambda step, wf: executed.append(step.id) or True):
+            self.assertTrue(self.workflow_manager.execute_workflow(workflow.id))
+
+        self.assertEqual(executed, ["unit", "e2e", "report"])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -6,6 +6,10 @@
 
 import json
 import uuid
+import threading
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
 from datetime import datetime
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
@@ -14,6 +18,39 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# 預編譯SQL語句（復用同一字符串對象以命中SQLite語句緩存）
+_SQL_INSERT_WORKFLOW = """
+    INSERT INTO workflows (project_id, name, type, config, status, created_at, updated_at, last_sync)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+"""
+_SQL_GET_BY_ID = "SELECT * FROM workflows WHERE id = ?"
+_SQL_GET_BY_PROJECT = """
+    SELECT * FROM workflows 
+    WHERE project_id = ? 
+    ORDER BY created_at DESC
+"""
+_SQL_GET_BY_TYPE = """
+    SELECT * FROM workflows 
+    WHERE type = ? 
+    ORDER BY created_at DESC
+"""
+_SQL_UPDATE_STATUS = """
+    UPDATE workflows 
+    SET status = ?, updated_at = ?, last_sync = ?
+    WHERE id = ?
+"""
+_SQL_COUNT_ALL = "SELECT COUNT(*) FROM workflows"
+_SQL_COUNT_BY_TYPE = """
+    SELECT type, COUNT(*) as count
+    FROM workflows
+    GROUP BY type
+"""
+_SQL_COUNT_BY_STATUS = """
+    SELECT status, COUNT(*) as count
+    FROM workflows
+    GROUP BY status
+"""
+
 class WorkflowType(Enum):
     """工作流類型"""
     CODING = "coding"
@@ -63,6 +100,54 @@ class Workflow:
         if self.config is None:
             self.config = {}
 
+def _step_graph(steps: List[WorkflowStep]) -> tuple:
+    """構建步驟圖 ((step_id, (dependency_id, ...)), ...)，作為執行計劃的緩存鍵"""
+    return tuple((step.id, tuple(step.dependencies)) for step in steps)
+
+@lru_cache(maxsize=512)
+def _plan_execution_waves(step_graph: tuple) -> tuple:
+    """按依賴關係將步驟分層（Kahn算法），同一層內的步驟互不依賴
+    
+    返回每層步驟在 step_graph 中的位置。無依賴的步驟保持聲明順序，
+    因此沒有聲明依賴的工作流與逐個順序執行完全一致；重複出現的步驟ID
+    按出現次數分別執行，依賴該ID時需等待其所有出現完成。
+    依賴不存在的步驟或存在循環依賴時拋出 ValueError。
+    同一工作流版本的步驟不可變，因此執行計劃可按步驟圖緩存。
+    """
+    positions: Dict[str, List[int]] = {}
+    for index, (step_id, _) in enumerate(step_graph):
+        positions.setdefault(step_id, []).append(index)
+    
+    remaining = {}
+    for index, (step_id, deps) in enumerate(step_graph):
+        unknown = [dep for dep in deps if dep not in positions]
+        if unknown:
+            raise ValueError(f"步驟 {step_id} 依賴不存在的步驟: {unknown}")
+        remaining[index] = {position for dep in deps for position in positions[dep]}
+    
+    waves = []
+    while remaining:
+        wave = tuple(index for index, deps in remaining.items() if not deps)
+        if not wave:
+            cyclic = sorted({step_graph[index][0] for index in remaining})
+            raise ValueError(f"工作流步驟存在循環依賴: {cyclic}")
+        waves.append(wave)
+        for index in wave:
+            del remaining[index]
+        for deps in remaining.values():
+            deps.difference_update(wave)
+    
+    return tuple(waves)
+
+def _validate_steps(steps: List[WorkflowStep]):
+    """校驗步驟ID唯一、依賴存在且無循環依賴，不合法時拋出 ValueError"""
+    counts = Counter(step.id for step in steps)
+    duplicates = sorted(step_id for step_id, count in counts.items() if count > 1)
+    if duplicates:
+        raise ValueError(f"工作流步驟ID重複: {duplicates}")
+    
+    _plan_execution_waves(_step_graph(steps))
+
 class WorkflowManager:
     """智慧UI工作流管理器"""
     
@@ -70,6 +155,12 @@ class WorkflowManager:
         self.db_manager = db_manager
         self.sync_engine = None
         
+        # 執行期間的同步記錄按線程暫存，在工作流級別邊界批量寫入
+        self._sync_local = threading.local()
+        # 寫入失敗的同步記錄，下次刷新時重新寫入
+        self._failed_sync: List[tuple] = []
+        self._failed_sync_lock = threading.Lock()
+        
         # 預定義工作流模板
         self.workflow_templates = {
             WorkflowType.CODING: {
@@ -168,6 +259,67 @@ class WorkflowManager:
         """設置同步引擎"""
         self.sync_engine = sync_engine
     
+    def _queue_sync(self, table_name: str, record_id: int, action: str, data: Dict[str, Any]):
+        """暫存同步記錄，不在批量模式下則立即刷新
+        
+        記錄附帶入隊時間，批量寫入時保持各記錄原有的先後順序。
+        """
+        if not self.sync_engine:
+            return
+        
+        record = (table_name, record_id, action, data, datetime.now())
+        pending = getattr(self._sync_local, "pending", None)
+        if pending is not None:
+            pending.append(record)
+        else:
+            self._flush_sync([record])
+    
+    @contextmanager
+    def _deferred_sync(self):
+        """在當前線程內暫存同步記錄，退出時一次性刷新
+        
+        暫存區按線程隔離，其他線程的狀態更新不受影響；嵌套使用時
+        記錄併入外層暫存區，由最外層統一刷新。
+        """
+        outer = getattr(self._sync_local, "pending", None)
+        pending = self._sync_local.pending = []
+        try:
+            yield
+        finally:
+            self._sync_local.pending = outer
+            if outer is not None:
+                outer.extend(pending)
+            else:
+                self._flush_sync(pending)
+    
+    def _flush_sync(self, records: List[tuple]):
+        """將同步記錄一次性寫入同步引擎
+        
+        寫入失敗時記錄會被保留，並在下一次刷新時重新寫入。
+        """
+        with self._failed_sync_lock:
+            if self._failed_sync:
+                records = self._failed_sync + records
+                self._failed_sync = []
+        
+        if not records or not self.sync_engine:
+            return
+        
+        add_sync_records = getattr(self.sync_engine, "add_sync_records", None)
+        written = 0
+        try:
+            if add_sync_records:
+                add_sync_records(records)
+                written = len(records)
+            else:
+                for record in records:
+                    self.sync_engine.add_sync_record(*record[:4])
+                    written += 1
+        except Exception:
+            with self._failed_sync_lock:
+                self._failed_sync = records[written:] + self._failed_sync
+            raise
+    
     def create_workflow(self, project_id: int, name: str, workflow_type: WorkflowType,
                        description: str = "", custom_steps: List[Dict] = None) -> Optional[Workflow]:
         """創建新工作流"""
@@ -184,6 +336,8 @@ class WorkflowManager:
                 else:
                     steps = []
             
+            _validate_steps(steps)
+            
             # 創建工作流配置
             config = {
                 "auto_execute": False,
@@ -196,17 +350,13 @@ class WorkflowManager:
             
             # 保存到數據庫
             conn = self.db_manager.get_local_connection()
-            cursor = conn.cursor()
             
             workflow_data = {
                 "steps": [step.__dict__ for step in steps],
                 "config": config
             }
             
-            cursor.execute("""
-                INSERT INTO workflows (project_id, name, type, config, status, created_at, updated_at, last_sync)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
+            cursor = conn.execute(_SQL_INSERT_WORKFLOW, (
                 project_id, name, workflow_type.value, json.dumps(workflow_data),
                 WorkflowStatus.DRAFT.value, now, now, now
             ))
@@ -246,10 +396,7 @@ class WorkflowManager:
         """根據ID獲取工作流"""
         try:
             conn = self.db_manager.get_local_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("SELECT * FROM workflows WHERE id = ?", (workflow_id,))
-            row = cursor.fetchone()
+            row = conn.execute(_SQL_GET_BY_ID, (workflow_id,)).fetchone()
             
             if row:
                 return self._row_to_workflow(row)
@@ -263,15 +410,7 @@ class WorkflowManager:
         """獲取項目的所有工作流"""
         try:
             conn = self.db_manager.get_local_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM workflows 
-                WHERE project_id = ? 
-                ORDER BY created_at DESC
-            """, (project_id,))
-            
-            rows = cursor.fetchall()
+            rows = conn.execute(_SQL_GET_BY_PROJECT, (project_id,)).fetchall()
             return [self._row_to_workflow(row) for row in rows]
             
         except Exception as e:
@@ -282,15 +421,7 @@ class WorkflowManager:
         """根據類型獲取工作流"""
         try:
             conn = self.db_manager.get_local_connection()
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT * FROM workflows 
-                WHERE type = ? 
-                ORDER BY created_at DESC
-            """, (workflow_type.value,))
-            
-            rows = cursor.fetchall()
+            rows = conn.execute(_SQL_GET_BY_TYPE, (workflow_type.value,)).fetchall()
             return [self._row_to_workflow(row) for row in rows]
             
         except Exception as e:
@@ -301,24 +432,18 @@ class WorkflowManager:
         """更新工作流狀態"""
         try:
             conn = self.db_manager.get_local_connection()
-            cursor = conn.cursor()
             
             now = datetime.now()
-            cursor.execute("""
-                UPDATE workflows 
-                SET status = ?, updated_at = ?, last_sync = ?
-                WHERE id = ?
-            """, (status.value, now, now, workflow_id))
+            cursor = conn.execute(_SQL_UPDATE_STATUS, (status.value, now, now, workflow_id))
             
             if cursor.rowcount > 0:
                 conn.commit()
                 
                 # 添加到同步隊列
-                if self.sync_engine:
-                    self.sync_engine.add_sync_record(
-                        "workflows", workflow_id, "update",
-                        {"status": status.value, "updated_at": now, "last_sync": now}
-                    )
+                self._queue_sync(
+                    "workflows", workflow_id, "update",
+                    {"status": status.value, "updated_at": now.isoformat(), "last_sync": now.isoformat()}
+                )
                 
                 logger.info(f"工作流 {workflow_id} 狀態更新為 {status.value}")
                 return True
@@ -340,6 +465,18 @@ class WorkflowManager:
             logger.error(f"工作流 {workflow_id} 狀態不是active，無法執行")
             return False
         
+        # 執行期間的狀態變更在工作流結束時統一同步
+        success = False
+        try:
+            with self._deferred_sync():
+                success = self._run_workflow(workflow)
+        except Exception as e:
+            logger.error(f"同步記錄刷新失敗，將在下次同步時重試: {e}")
+        return success
+    
+    def _run_workflow(self, workflow: Workflow) -> bool:
+        """執行工作流並更新其狀態"""
+        workflow_id = workflow.id
         try:
             # 更新狀態為運行中
             self.update_workflow_status(workflow_id, WorkflowStatus.RUNNING)
@@ -363,16 +500,19 @@ class WorkflowManager:
         """執行工作流步驟"""
         logger.info(f"開始執行工作流: {workflow.name}")
         
-        for step in workflow.steps:
-            logger.info(f"執行步驟: {step.name}")
-            
-            # 這裡是步驟執行的模擬
-            # 實際實現中會根據步驟類型調用相應的執行器
-            success = self._execute_step(step, workflow)
-            
-            if not success:
-                logger.error(f"步驟 {step.name} 執行失敗")
-                return False
+        steps = workflow.steps
+        for wave in _plan_execution_waves(_step_graph(steps)):
+            for index in wave:
+                step = steps[index]
+                logger.info(f"執行步驟: {step.name}")
+                
+                # 這裡是步驟執行的模擬
+                # 實際實現中會根據步驟類型調用相應的執行器
+                success = self._execute_step(step, workflow)
+                
+                if not success:
+                    logger.error(f"步驟 {step.name} 執行失敗")
+                    return False
         
         logger.info(f"工作流 {workflow.name} 所有步驟執行完成")
         return True
@@ -444,27 +584,15 @@ class WorkflowManager:
         """獲取工作流統計信息"""
         try:
             conn = self.db_manager.get_local_connection()
-            cursor = conn.cursor()
             
             # 總工作流數
-            cursor.execute("SELECT COUNT(*) FROM workflows")
-            total_workflows = cursor.fetchone()[0]
+            total_workflows = conn.execute(_SQL_COUNT_ALL).fetchone()[0]
             
             # 按類型統計
-            cursor.execute("""
-                SELECT type, COUNT(*) as count
-                FROM workflows
-                GROUP BY type
-            """)
-            type_stats = dict(cursor.fetchall())
+            type_stats = dict(conn.execute(_SQL_COUNT_BY_TYPE).fetchall())
             
             # 按狀態統計
-            cursor.execute("""
-                SELECT status, COUNT(*) as count
-                FROM workflows
-                GROUP BY status
-            """)
-            status_stats = dict(cursor.fetchall())
+            status_stats = dict(conn.execute(_SQL_COUNT_BY_STATUS).fetchall())
             
             return {
                 "total_workflows": total_workflows,
@@ -10,14 +10,32 @@ KiloCode MCP - 兜底创建引擎
 - 智能适应：根据需求类型智能选择创建策略
 """
 
+import re
 import json
+import time
 import asyncio
+import inspect
+import atexit
 import logging
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+import logging.handlers
+from typing import Dict, Any, Optional, List, Tuple, Union, Awaitable, Mapping
+from datetime import datetime, date
 from enum import Enum
+from functools import lru_cache
+from types import MappingProxyType
+from string import Template
 
-class WorkflowType(Enum):
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class WorkflowType(str, Enum):
     """六大工作流类型"""
     REQUIREMENTS_ANALYSIS = "requirements_analysis"
     ARCHITECTURE_DESIGN = "architecture_design"
@@ -26,223 +44,116 @@ class WorkflowType(Enum):
     DEPLOYMENT_RELEASE = "deployment_release"
     MONITORING_OPERATIONS = "monitoring_operations"
 
-class CreationType(Enum):
+class CreationType(str, Enum):
     """创建类型"""
     DOCUMENT = "document"  # 文档类：PPT、报告、方案
     CODE = "code"         # 代码类：应用、脚本、工具
     PROTOTYPE = "prototype"  # 原型类：demo、验证、示例
     TOOL = "tool"         # 工具类：测试工具、部署脚本、监控脚本
 
-class KiloCodeMCP:
-    """
-    KiloCode MCP - 兜底创建引擎
-    
-    职责：
-    1. 作为所有工作流的最后兜底
-    2. 根据工作流上下文创建不同类型的解决方案
-    3. 通过coordinator与其他MCP通信
-    4. 智能选择创建策略
-    """
-    
-    def __init__(self, coordinator_client=None):
-        self.name = "kilocode_mcp"
-        self.version = "2.0.0"
-        self.coordinator = coordinator_client
-        self.logger = self._setup_logger()
-        
-        # 工作流创建策略映射
-        self.workflow_strategies = {
-            WorkflowType.REQUIREMENTS_ANALYSIS: self._create_for_requirements,
-            WorkflowType.ARCHITECTURE_DESIGN: self._create_for_architecture,
-            WorkflowType.CODING_IMPLEMENTATION: self._create_for_coding,
-            WorkflowType.TESTING_VERIFICATION: self._create_for_testing,
-            WorkflowType.DEPLOYMENT_RELEASE: self._create_for_deployment,
-            WorkflowType.MONITORING_OPERATIONS: self._create_for_monitoring
-        }
-        
-    def _setup_logger(self):
-        """设置日志"""
-        logger = logging.getLogger(f"{self.name}")
-        logger.setLevel(logging.INFO)
-        if not logger.handlers:
-            handler = logging.StreamHandler()
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-            handler.setFormatter(formatter)
-            logger.addHandler(handler)
-        return logger
-    
-    async def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
-        """
-        处理兜底创建请求
-        
-        Args:
-            request: 包含workflow_type, content, context等信息的请求
-            
-        Returns:
-            创建结果
-        """
-        try:
-            self.logger.info(f"KiloCode MCP 接收兜底请求: {request.get('content', '')[:100]}...")
-            
-            # 解析请求
-            workflow_type = self._parse_workflow_type(request)
-            creation_type = self._determine_creation_type(request)
-            
-            # 选择创建策略
-            strategy = self.workflow_strategies.get(workflow_type)
-            if not strategy:
-                return self._create_generic_solution(request)
-            
-            # 执行创建
-            result = await strategy(request, creation_type)
-            
-            self.logger.info(f"KiloCode MCP 创建完成: {result.get('type', 'unknown')}")
-            return result
-            
-        except Exception as e:
-            self.logger.error(f"KiloCode MCP 处理失败: {str(e)}")
-            return {
-                "success": False,
-                "error": str(e),
-                "fallback_solution": "请提供更多信息以便创建解决方案"
-            }
-    
-    def _parse_workflow_type(self, request: Dict[str, Any]) -> WorkflowType:
-        """解析工作流类型"""
-        context = request.get('context', {})
-        workflow = context.get('workflow_type', '')
-        
-        # 从上下文中获取工作流类型
-        for wf_type in WorkflowType:
-            if wf_type.value in workflow.lower():
-                return wf_type
-        
-        # 基于内容推断工作流类型
-        content = request.get('content', '').lower()
-        
-        if any(keyword in content for keyword in ['ppt', '报告', '展示', '汇报', '需求', '分析']):
-            return WorkflowType.REQUIREMENTS_ANALYSIS
-        elif any(keyword in content for keyword in ['架构', '设计', '模式', '框架']):
-            return WorkflowType.ARCHITECTURE_DESIGN
-        elif any(keyword in content for keyword in ['代码', '编程', '开发', '实现', '游戏', '应用']):
-            return WorkflowType.CODING_IMPLEMENTATION
-        elif any(keyword in content for keyword in ['测试', '验证', '检查']):
-            return WorkflowType.TESTING_VERIFICATION
-        elif any(keyword in content for keyword in ['部署', '发布', '上线']):
-            return WorkflowType.DEPLOYMENT_RELEASE
-        elif any(keyword in content for keyword in ['监控', '运维', '性能']):
-            return WorkflowType.MONITORING_OPERATIONS
-        
-        # 默认为编码实现
-        return WorkflowType.CODING_IMPLEMENTATION
-    
-    def _determine_creation_type(self, request: Dict[str, Any]) -> CreationType:
-        """确定创建类型"""
-        content = request.get('content', '').lower()
-        
-        if any(keyword in content for keyword in ['ppt', '报告', '文档', '展示']):
-            return CreationType.DOCUMENT
-        elif any(keyword in content for keyword in ['demo', '原型', '验证', '示例']):
-            return CreationType.PROTOTYPE
-        elif any(keyword in content for keyword in ['工具', '脚本', '自动化']):
-            return CreationType.TOOL
-        else:
-            return CreationType.CODE
-    
-    async def _create_for_requirements(self, request: Dict[str, Any], creation_type: CreationType) -> Dict[str, Any]:
-        """为需求分析工作流创建解决方案"""
-        content = request.get('content', '')
-        
-        if creation_type == CreationType.DOCUMENT:
-            # 创建PPT、报告等文档
-            return await self._create_business_document(content)
-        elif creation_type == CreationType.PROTOTYPE:
-            # 创建需求原型
-            return await self._create_requirement_prototype(content)
-        else:
-            # 创建需求分析工具
-            return await self._create_analysis_tool(content)
-    
-    async def _create_for_architecture(self, request: Dict[str, Any], creation_type: CreationType) -> Dict[str, Any]:
-        """为架构设计工作流创建解决方案"""
-        content = request.get('content', '')
-        
-        if creation_type == CreationType.DOCUMENT:
-            # 创建架构文档
-            return await self._create_architecture_document(content)
-        elif creation_type == CreationType.CODE:
-            # 创建架构代码框架
-            return await self._create_architecture_framework(content)
-        else:
-            # 创建架构设计工具
-            return await self._create_design_tool(content)
-    
-    async def _create_for_coding(self, request: Dict[str, Any], creation_type: CreationType) -> Dict[str, Any]:
-        """为编码实现工作流创建解决方案"""
-        content = request.get('content', '')
-        
-        # 这是kilocode_mcp的核心领域
-        if '贪吃蛇' in content or 'snake' in content.lower():
-            return await self._create_snake_game(content)
-        elif '游戏' in content or 'game' in content.lower():
-            return await self._create_game_application(content)
-        elif 'web' in content.lower() or '网站' in content:
-            return await self._create_web_application(content)
-        else:
-            return await self._create_general_code(content)
-    
-    async def _create_for_testing(self, request: Dict[str, Any], creation_type: CreationType) -> Dict[str, Any]:
-        """为测试验证工作流创建解决方案"""
-        content = request.get('content', '')
-        return await self._create_test_solution(content)
-    
-    async def _create_for_deployment(self, request: Dict[str, Any], creation_type: CreationType) -> Dict[str, Any]:
-        """为部署发布工作流创建解决方案"""
-        content = request.get('content', '')
-        return await self._create_deployment_solution(content)
-    
-    async def _create_for_monitoring(self, request: Dict[str, Any], creation_type: CreationType) -> Dict[str, Any]:
-        """为监控运维工作流创建解决方案"""
-        content = request.get('content', '')
-        return await self._create_monitoring_solution(content)
-    
-    async def _create_business_document(self, content: str) -> Dict[str, Any]:
-        """创建业务文档（PPT等）"""
-        # 通过coordinator请求gemini_mcp或claude_mcp协助
-        if self.coordinator:
-            ai_request = {
-                "target_mcp": "gemini_mcp",
-                "action": "generate_content",
-                "content": f"创建专业的业务展示文档：{content}",
-                "format": "structured_document"
-            }
-            ai_result = await self.coordinator.send_request(ai_request)
-            
-            if ai_result.get('success'):
-                return {
-                    "success": True,
-                    "type": "business_document",
-                    "content": ai_result.get('content'),
-                    "format": "ppt_outline",
-                    "created_by": "kilocode_mcp",
-                    "ai_assisted": True
-                }
-        
-        # 兜底方案：自己创建基础结构
-        return {
-            "success": True,
-            "type": "business_document",
-            "content": self._generate_ppt_structure(content),
-            "format": "ppt_outline",
-            "created_by": "kilocode_mcp",
-            "ai_assisted": False
-        }
+# 分类关键词表（按优先级排列，导入时预编译为自动机/正则）
+_WORKFLOW_KEYWORDS = (
+    (WorkflowType.REQUIREMENTS_ANALYSIS, frozenset(['ppt', '报告', '展示', '汇报', '需求', '分析'])),
+    (WorkflowType.ARCHITECTURE_DESIGN, frozenset(['架构', '设计', '模式', '框架'])),
+    (WorkflowType.CODING_IMPLEMENTATION, frozenset(['代码', '编程', '开发', '实现', '游戏', '应用'])),
+    (WorkflowType.TESTING_VERIFICATION, frozenset(['测试', '验证', '检查'])),
+    (WorkflowType.DEPLOYMENT_RELEASE, frozenset(['部署', '发布', '上线'])),
+    (WorkflowType.MONITORING_OPERATIONS, frozenset(['监控', '运维', '性能'])),
+)
+
+_CREATION_KEYWORDS = (
+    (CreationType.DOCUMENT, frozenset(['ppt', '报告', '文档', '展示'])),
+    (CreationType.PROTOTYPE, frozenset(['demo', '原型', '验证', '示例'])),
+    (CreationType.TOOL, frozenset(['工具', '脚本', '自动化'])),
+)
+
+def _compile_keywords(keywords) -> re.Pattern:
+    """将关键词集合编译为单个交替正则"""
+    return re.compile("|".join(map(re.escape, sorted(keywords))))
+
+def _build_automaton(keyword_table):
+    """将关键词表构建为Aho-Corasick自动机，值为分组序号；未安装pyahocorasick时返回None"""
+    if ahocorasick is None:
+        return None
+    
+    automaton = ahocorasick.Automaton()
+    for index, (_, keywords) in enumerate(keyword_table):
+        for keyword in keywords:
+            # 同一关键词出现在多个分组时保留优先级最高的分组
+            if keyword not in automaton:
+                automaton.add_word(keyword, index)
+    automaton.make_automaton()
+    return automaton
+
+def _first_matching_bucket(automaton, patterns, content_lower: str) -> Optional[int]:
+    """返回内容命中的最高优先级分组序号，未命中返回None"""
+    if automaton is not None:
+        # 单次线性扫描找出所有命中关键词，取优先级最高的分组
+        best = None
+        for _, index in automaton.iter(content_lower):
+            if best is None or index < best:
+                best = index
+                if best == 0:
+                    break
+        return best
+    
+    for index, (_, pattern) in enumerate(patterns):
+        if pattern.search(content_lower):
+            return index
+    return None
+
+_WORKFLOW_PATTERNS = [(wf, _compile_keywords(kws)) for wf, kws in _WORKFLOW_KEYWORDS]
+_CREATION_PATTERNS = [(ct, _compile_keywords(kws)) for ct, kws in _CREATION_KEYWORDS]
+_WORKFLOW_AUTOMATON = _build_automaton(_WORKFLOW_KEYWORDS)
+_CREATION_AUTOMATON = _build_automaton(_CREATION_KEYWORDS)
+
+# 上下文中的工作流类型值 -> 枚举成员（成员本身即字符串，可直接自映射）
+_WORKFLOW_BY_VALUE = {wf: wf for wf in WorkflowType}
+
+# 请求未携带context时共用的只读空映射，避免每次分配空字典
+_EMPTY_DICT = MappingProxyType({})
+
+# coordinator批量提交：批次窗口（秒）与单批最大请求数
+_AI_BATCH_WINDOW = 0.001
+_AI_BATCH_MAX_SIZE = 16
+
+# 超过该长度的内容不进入分类缓存（长文本哈希成本高且几乎不会重复）
+_CLASSIFY_CACHE_MAX_CONTENT = 512
+
+def _match_workflow_type(workflow_hint: str, content_lower: str) -> WorkflowType:
+    """根据上下文提示和内容关键词匹配工作流类型"""
+    # 上下文直接给出工作流类型值时O(1)命中
+    exact = _WORKFLOW_BY_VALUE.get(workflow_hint)
+    if exact is not None:
+        return exact
+    
+    # 提示中包含多个类型值时按枚举声明顺序取优先级最高的成员
+    for workflow_type in WorkflowType:
+        if workflow_type in workflow_hint:
+            return workflow_type
+    
+    index = _first_matching_bucket(_WORKFLOW_AUTOMATON, _WORKFLOW_PATTERNS, content_lower)
+    if index is not None:
+        return _WORKFLOW_KEYWORDS[index][0]
+    
+    # 默认为编码实现
+    return WorkflowType.CODING_IMPLEMENTATION
+
+def _match_creation_type(content_lower: str) -> CreationType:
+    """根据内容关键词匹配创建类型"""
+    index = _first_matching_bucket(_CREATION_AUTOMATON, _CREATION_PATTERNS, content_lower)
+    if index is not None:
+        return _CREATION_KEYWORDS[index][0]
     
-    async def _create_snake_game(self, content: str) -> Dict[str, Any]:
-        """创建贪吃蛇游戏"""
-        snake_code = '''
+    return CreationType.CODE
+
+@lru_cache(maxsize=1024)
+def _classify(content_lower: str, workflow_hint: str) -> Tuple[WorkflowType, CreationType]:
+    """分类请求，重复内容直接命中缓存"""
+    return _match_workflow_type(workflow_hint, content_lower), _match_creation_type(content_lower)
+
+# 创建模板（导入时构建一次，调用时只替换用户内容部分）
+_SNAKE_GAME_CODE = '''
 import pygame
 import random
 import sys
@@ -392,91 +303,26 @@ def main():
 if __name__ == "__main__":
     main()
 '''
-        
-        return {
-            "success": True,
-            "type": "game_application",
-            "content": snake_code,
-            "language": "python",
-            "dependencies": ["pygame"],
-            "instructions": "运行前请安装pygame: pip install pygame",
-            "created_by": "kilocode_mcp",
-            "description": "完整的贪吃蛇游戏实现，包含游戏逻辑、碰撞检测和得分系统"
-        }
-    
-    async def _create_architecture_document(self, content: str) -> Dict[str, Any]:
-        """创建架构文档"""
-        return {
-            "success": True,
-            "type": "architecture_document",
-            "content": f"# {content}\n\n## 系统架构设计\n\n### 整体架构\n- 微服务架构\n- 容器化部署\n- API网关\n\n### 技术栈\n- 后端：Python/Java\n- 数据库：PostgreSQL\n- 缓存：Redis\n- 消息队列：RabbitMQ",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_architecture_framework(self, content: str) -> Dict[str, Any]:
-        """创建架构代码框架"""
-        return {
-            "success": True,
-            "type": "architecture_framework",
-            "content": "# 架构框架代码\nclass MicroserviceFramework:\n    def __init__(self):\n        self.services = []\n    \n    def add_service(self, service):\n        self.services.append(service)",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_design_tool(self, content: str) -> Dict[str, Any]:
-        """创建设计工具"""
-        return {
-            "success": True,
-            "type": "design_tool",
-            "content": "# 设计工具代码\ndef generate_architecture_diagram():\n    print('生成架构图...')",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_requirement_prototype(self, content: str) -> Dict[str, Any]:
-        """创建需求原型"""
-        return {
-            "success": True,
-            "type": "requirement_prototype",
-            "content": f"# {content} 需求原型\n\n## 功能原型\n- 核心功能演示\n- 用户界面原型\n- 交互流程图",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_analysis_tool(self, content: str) -> Dict[str, Any]:
-        """创建分析工具"""
-        return {
-            "success": True,
-            "type": "analysis_tool",
-            "content": "# 需求分析工具\ndef analyze_requirements():\n    print('分析需求...')",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_web_application(self, content: str) -> Dict[str, Any]:
-        """创建Web应用"""
-        return {
-            "success": True,
-            "type": "web_application",
-            "content": "# Web应用代码\nfrom flask import Flask\napp = Flask(__name__)\n\n@app.route('/')\ndef home():\n    return 'Hello World!'",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_game_application(self, content: str) -> Dict[str, Any]:
-        """创建游戏应用"""
-        return {
-            "success": True,
-            "type": "game_application",
-            "content": "# 游戏应用代码\nimport pygame\n\ndef main():\n    pygame.init()\n    print('游戏启动')",
-            "created_by": "kilocode_mcp"
-        }
-    
-    def _generate_ppt_structure(self, content: str) -> str:
-        """生成PPT基础结构"""
-        return f"""
-# {content} - 业务汇报PPT大纲
+
+# PPT日期字符串缓存：[日序号, 格式化日期]，跨日时刷新
+_TODAY_CACHE = [0, ""]
+
+def _today_str() -> str:
+    """返回当天的PPT日期字符串，同一天内只格式化一次"""
+    today = date.today()
+    ordinal = today.toordinal()
+    if ordinal != _TODAY_CACHE[0]:
+        _TODAY_CACHE[:] = [ordinal, today.strftime('%Y年%m月%d日')]
+    return _TODAY_CACHE[1]
+
+_PPT_TEMPLATE = Template("""
+# ${content} - 业务汇报PPT大纲
 
 ## 第1页：封面
-- 标题：{content}
+- 标题：${content}
 - 副标题：2024年度总结报告
 - 汇报人：[姓名]
-- 日期：{datetime.now().strftime('%Y年%m月%d日')}
+- 日期：${date}
 
 ## 第2页：目录
 1. 业务概览
@@ -513,7 +359,405 @@ if __name__ == "__main__":
 ## 第8页：谢谢
 - 感谢聆听
 - 联系方式
-"""
+""")
+
+_ARCHITECTURE_DOCUMENT_BODY = "\n\n## 系统架构设计\n\n### 整体架构\n- 微服务架构\n- 容器化部署\n- API网关\n\n### 技术栈\n- 后端：Python/Java\n- 数据库：PostgreSQL\n- 缓存：Redis\n- 消息队列：RabbitMQ"
+_ARCHITECTURE_FRAMEWORK_CODE = "# 架构框架代码\nclass MicroserviceFramework:\n    def __init__(self):\n        self.services = []\n    \n    def add_service(self, service):\n        self.services.append(service)"
+_DESIGN_TOOL_CODE = "# 设计工具代码\ndef generate_architecture_diagram():\n    print('生成架构图...')"
+_REQUIREMENT_PROTOTYPE_BODY = " 需求原型\n\n## 功能原型\n- 核心功能演示\n- 用户界面原型\n- 交互流程图"
+_ANALYSIS_TOOL_CODE = "# 需求分析工具\ndef analyze_requirements():\n    print('分析需求...')"
+_WEB_APPLICATION_CODE = "# Web应用代码\nfrom flask import Flask\napp = Flask(__name__)\n\n@app.route('/')\ndef home():\n    return 'Hello World!'"
+_GAME_APPLICATION_CODE = "# 游戏应用代码\nimport pygame\n\ndef main():\n    pygame.init()\n    print('游戏启动')"
+_GENERAL_CODE_BODY = "\n# TODO: 实现具体功能\n\ndef main():\n    print('Hello, World!')\n\nif __name__ == '__main__':\n    main()"
+
+# 所有创建结果共用的字段
+_BASE_RESULT = {"success": True, "created_by": "kilocode_mcp"}
+
+def _make_result(type_: str, content: Any, **extra) -> Dict[str, Any]:
+    """基于共用字段构建创建结果"""
+    return {**_BASE_RESULT, "type": type_, "content": content, **extra}
+
+# 与请求内容和创建类型无关的工作流，结果在导入时确定
+_TRIVIAL_RESULTS = {
+    WorkflowType.TESTING_VERIFICATION: _make_result(
+        "test_framework",
+        "# 测试框架模板\nimport unittest\n\nclass TestCase(unittest.TestCase):\n    def test_example(self):\n        self.assertTrue(True)"
+    ),
+    WorkflowType.DEPLOYMENT_RELEASE: _make_result(
+        "deployment_script",
+        "#!/bin/bash\n# 部署脚本模板\necho '开始部署...'\n# TODO: 添加部署逻辑"
+    ),
+    WorkflowType.MONITORING_OPERATIONS: _make_result(
+        "monitoring_tool",
+        "# 监控工具模板\nimport time\n\ndef monitor():\n    while True:\n        print('系统运行正常')\n        time.sleep(60)"
+    )
+}
+
+class _BufferedLogHandler(logging.handlers.MemoryHandler):
+    """
+    批量写出的日志缓冲
+    
+    缓冲满、出现ERROR及以上级别的记录，或距上次写出超过flush_interval秒时
+    写出全部缓冲记录。间隔检查在记录到达时进行，空闲期间缓冲中的记录
+    留到下一条日志或进程退出时写出。
+    """
+    
+    def __init__(self, capacity, flushLevel=logging.ERROR, target=None, flush_interval=1.0):
+        super().__init__(capacity, flushLevel=flushLevel, target=target)
+        self.flush_interval = flush_interval
+        self._last_flush = time.monotonic()
+    
+    def shouldFlush(self, record):
+        return (super().shouldFlush(record)
+                or time.monotonic() - self._last_flush >= self.flush_interval)
+    
+    def flush(self):
+        super().flush()
+        self._last_flush = time.monotonic()
+
+class _WorkflowStrategy:
+    """绑定工作流类型的创建策略，调用时解析到传入的KiloCodeMCP实例"""
+    
+    __slots__ = ("workflow_type",)
+    
+    def __init__(self, workflow_type: WorkflowType):
+        self.workflow_type = workflow_type
+    
+    def __call__(self, mcp: "KiloCodeMCP", request: Dict[str, Any],
+                 creation_type: CreationType) -> Awaitable[Dict[str, Any]]:
+        return mcp._run_workflow_strategy(self.workflow_type, request, creation_type)
+
+class KiloCodeMCP:
+    """
+    KiloCode MCP - 兜底创建引擎
+    
+    职责：
+    1. 作为所有工作流的最后兜底
+    2. 根据工作流上下文创建不同类型的解决方案
+    3. 通过coordinator与其他MCP通信
+    4. 智能选择创建策略
+    """
+    
+    # 实例属性固定使用槽位存储，不分配__dict__；需要替换方法时在类上打补丁
+    __slots__ = ("name", "version", "coordinator", "logger", "_batch_ai_requests", "_pending_ai_requests",
+                 "_ai_batch_tasks")
+    
+    # 工作流类型 -> 创建策略的只读映射，类级别共享、只构建一次，与其他KiloCode
+    # 实现的策略表对应；调用时传入实例：await strategy(mcp, request, creation_type)。
+    # process_request内部直接分派，不经过该映射。
+    workflow_strategies: Mapping[WorkflowType, _WorkflowStrategy] = MappingProxyType({
+        workflow_type: _WorkflowStrategy(workflow_type) for workflow_type in WorkflowType
+    })
+    
+    def __init__(self, coordinator_client=None, batch_ai_requests: bool = False):
+        self.name = "kilocode_mcp"
+        self.version = "2.0.0"
+        self.coordinator = coordinator_client
+        self.logger = self._setup_logger()
+        
+        # 显式启用后通过coordinator.send_batch合并提交AI请求
+        if batch_ai_requests and not inspect.iscoroutinefunction(getattr(coordinator_client, 'send_batch', None)):
+            raise ValueError("batch_ai_requests需要coordinator提供异步send_batch方法")
+        self._batch_ai_requests = batch_ai_requests
+        
+        # 等待批量提交给coordinator的AI请求
+        self._pending_ai_requests: List[Tuple[Dict[str, Any], asyncio.Future]] = []
+        # 进行中的批量提交任务，持有引用以免任务被垃圾回收
+        self._ai_batch_tasks: set = set()
+        
+    def _setup_logger(self):
+        """设置日志"""
+        logger = logging.getLogger(f"{self.name}")
+        logger.setLevel(logging.INFO)
+        if not logger.handlers:
+            stream_handler = logging.StreamHandler()
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+            stream_handler.setFormatter(formatter)
+            
+            # 缓冲日志记录，批量写出；ERROR及以上立即刷新，其余最多延迟约1秒
+            handler = _BufferedLogHandler(
+                capacity=64,
+                flushLevel=logging.ERROR,
+                target=stream_handler,
+                flush_interval=1.0
+            )
+            atexit.register(handler.flush)
+            logger.addHandler(handler)
+        return logger
+    
+    async def process_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        处理兜底创建请求
+        
+        Args:
+            request: 包含workflow_type, content, context等信息的请求
+            
+        Returns:
+            创建结果
+        """
+        try:
+            content = request.get('content', '')
+            self.logger.info("KiloCode MCP 接收兜底请求: %.100s...", content)
+            
+            # 解析请求（内容只做一次小写转换，分类器和创建策略共用）
+            content_lower = content.lower()
+            context = request.get('context') or _EMPTY_DICT
+            workflow_hint = context.get('workflow_type', '').lower()
+            if len(content_lower) <= _CLASSIFY_CACHE_MAX_CONTENT:
+                workflow_type, creation_type = _classify(content_lower, workflow_hint)
+            else:
+                workflow_type, creation_type = _classify.__wrapped__(content_lower, workflow_hint)
+            
+            # 选择并执行创建策略
+            result = self._execute_strategy(workflow_type, content, content_lower, creation_type)
+            if result is None:
+                return self._create_generic_solution(request)
+            
+            if inspect.isawaitable(result):
+                result = await result
+            
+            self.logger.info("KiloCode MCP 创建完成: %s", result.get('type', 'unknown'))
+            return result
+            
+        except Exception as e:
+            self.logger.error("KiloCode MCP 处理失败: %s", e)
+            return {
+                "success": False,
+                "error": str(e),
+                "fallback_solution": "请提供更多信息以便创建解决方案"
+            }
+    
+    async def _run_workflow_strategy(self, workflow_type: WorkflowType, request: Dict[str, Any],
+                                     creation_type: CreationType) -> Dict[str, Any]:
+        """按旧接口签名执行指定工作流的创建策略"""
+        content = request.get('content', '')
+        result = self._execute_strategy(workflow_type, content, content.lower(), creation_type)
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    
+    def _execute_strategy(self, workflow_type: WorkflowType, content: str, content_lower: str,
+                          creation_type: CreationType) -> Union[Dict[str, Any], Awaitable[Dict[str, Any]], None]:
+        """
+        执行工作流对应的创建策略
+        
+        模板化工作流直接查表；纯计算的策略直接返回结果，需要coordinator的策略
+        返回协程；没有对应策略时返回None。
+        """
+        trivial_result = _TRIVIAL_RESULTS.get(workflow_type)
+        if trivial_result is not None:
+            return dict(trivial_result)
+        
+        match workflow_type:
+            case WorkflowType.REQUIREMENTS_ANALYSIS:
+                return self._create_for_requirements(content, content_lower, creation_type)
+            case WorkflowType.ARCHITECTURE_DESIGN:
+                return self._create_for_architecture(content, content_lower, creation_type)
+            case WorkflowType.CODING_IMPLEMENTATION:
+                return self._create_for_coding(content, content_lower, creation_type)
+        return None
+    
+    async def process_requests(self, requests: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        批量处理兜底创建请求
+        
+        重复内容的分类直接命中分类缓存，各请求并发执行；
+        需要AI协助的请求在同一批次窗口内合并提交给coordinator。
+        
+        Args:
+            requests: 请求列表，格式同process_request
+            
+        Returns:
+            与请求顺序一致的创建结果列表
+        """
+        return list(await asyncio.gather(*[self.process_request(request) for request in requests]))
+    
+    async def _send_ai_request(self, ai_request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        向coordinator发送AI请求
+        
+        启用batch_ai_requests时，同一批次窗口内的请求合并为一次send_batch提交；
+        否则逐个调用send_request。
+        """
+        if not self._batch_ai_requests:
+            return await self.coordinator.send_request(ai_request)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._pending_ai_requests.append((ai_request, future))
+        
+        # 批次由独立的提交任务发送，发起请求的任务被取消也不影响批次中的其他请求
+        if len(self._pending_ai_requests) >= _AI_BATCH_MAX_SIZE:
+            self._start_ai_batch_task(self._submit_ai_batch())
+        elif len(self._pending_ai_requests) == 1:
+            self._start_ai_batch_task(self._submit_ai_batch_after_window())
+        
+        return await future
+    
+    def _start_ai_batch_task(self, submission: Awaitable[None]):
+        """启动批量提交任务并持有引用直到完成"""
+        task = asyncio.create_task(submission)
+        self._ai_batch_tasks.add(task)
+        task.add_done_callback(self._ai_batch_tasks.discard)
+    
+    async def _submit_ai_batch_after_window(self):
+        """
+        提交当前批次
+        
+        任务在同一轮事件循环中已发起的请求入队之后才运行；此时批次中只有
+        一个请求则立即提交，否则再等待一个批次窗口收集后续请求。
+        """
+        if len(self._pending_ai_requests) > 1:
+            await asyncio.sleep(_AI_BATCH_WINDOW)
+        await self._submit_ai_batch()
+    
+    async def _submit_ai_batch(self):
+        """将待提交的AI请求一次性发送给coordinator并分发结果"""
+        batch, self._pending_ai_requests = self._pending_ai_requests, []
+        if not batch:
+            return
+        
+        results = []
+        error = {"success": False, "error": "Coordinator批量请求结果缺失"}
+        try:
+            results = list(await self.coordinator.send_batch([req for req, _ in batch]))
+        except Exception as e:
+            error = {"success": False, "error": f"Coordinator批量请求异常: {str(e)}"}
+        finally:
+            # 提交任务被取消时同样分发结果，避免批次中的请求永久等待
+            for index, (_, future) in enumerate(batch):
+                if not future.done():
+                    future.set_result(results[index] if index < len(results) else dict(error))
+    
+    def _parse_workflow_type(self, request: Dict[str, Any], content_lower: Optional[str] = None) -> WorkflowType:
+        """解析工作流类型"""
+        context = request.get('context') or _EMPTY_DICT
+        workflow = context.get('workflow_type', '')
+        
+        if content_lower is None:
+            content_lower = request.get('content', '').lower()
+        
+        return _match_workflow_type(workflow.lower(), content_lower)
+    
+    def _determine_creation_type(self, request: Dict[str, Any], content_lower: Optional[str] = None) -> CreationType:
+        """确定创建类型"""
+        if content_lower is None:
+            content_lower = request.get('content', '').lower()
+        
+        return _match_creation_type(content_lower)
+    
+    def _create_for_requirements(self, content: str, content_lower: str, creation_type: CreationType) -> Union[Dict[str, Any], Awaitable[Dict[str, Any]]]:
+        """为需求分析工作流创建解决方案"""
+        if creation_type == CreationType.DOCUMENT:
+            # 创建PPT、报告等文档（无coordinator时直接同步兜底）
+            if self.coordinator is None:
+                return self._create_fallback_business_document(content)
+            return self._create_business_document(content)
+        elif creation_type == CreationType.PROTOTYPE:
+            # 创建需求原型
+            return self._create_requirement_prototype(content)
+        else:
+            # 创建需求分析工具
+            return self._create_analysis_tool(content)
+    
+    def _create_for_architecture(self, content: str, content_lower: str, creation_type: CreationType) -> Dict[str, Any]:
+        """为架构设计工作流创建解决方案"""
+        if creation_type == CreationType.DOCUMENT:
+            # 创建架构文档
+            return self._create_architecture_document(content)
+        elif creation_type == CreationType.CODE:
+            # 创建架构代码框架
+            return self._create_architecture_framework(content)
+        else:
+            # 创建架构设计工具
+            return self._create_design_tool(content)
+    
+    def _create_for_coding(self, content: str, content_lower: str, creation_type: CreationType) -> Union[Dict[str, Any], Awaitable[Dict[str, Any]]]:
+        """为编码实现工作流创建解决方案"""
+        # 这是kilocode_mcp的核心领域
+        if '贪吃蛇' in content_lower or 'snake' in content_lower:
+            return self._create_snake_game(content)
+        elif '游戏' in content_lower or 'game' in content_lower:
+            return self._create_game_application(content)
+        elif 'web' in content_lower or '网站' in content_lower:
+            return self._create_web_application(content)
+        elif self.coordinator is None:
+            return self._create_fallback_general_code(content)
+        else:
+            return self._create_general_code(content)
+    
+    async def _create_business_document(self, content: str) -> Dict[str, Any]:
+        """创建业务文档（PPT等）"""
+        # 通过coordinator请求gemini_mcp或claude_mcp协助
+        if self.coordinator:
+            ai_request = {
+                "target_mcp": "gemini_mcp",
+                "action": "generate_content",
+                "content": f"创建专业的业务展示文档：{content}",
+                "format": "structured_document"
+            }
+            ai_result = await self._send_ai_request(ai_request)
+            
+            if ai_result.get('success'):
+                return _make_result(
+                    "business_document", ai_result.get('content'),
+                    format="ppt_outline", ai_assisted=True
+                )
+        
+        return self._create_fallback_business_document(content)
+    
+    def _create_fallback_business_document(self, content: str) -> Dict[str, Any]:
+        """兜底方案：自己创建业务文档基础结构"""
+        return _make_result(
+            "business_document", self._generate_ppt_structure(content),
+            format="ppt_outline", ai_assisted=False
+        )
+    
+    def _create_snake_game(self, content: str) -> Dict[str, Any]:
+        """创建贪吃蛇游戏"""
+        return _make_result(
+            "game_application", _SNAKE_GAME_CODE,
+            language="python",
+            dependencies=["pygame"],
+            instructions="运行前请安装pygame: pip install pygame",
+            description="完整的贪吃蛇游戏实现，包含游戏逻辑、碰撞检测和得分系统"
+        )
+    
+    def _create_architecture_document(self, content: str) -> Dict[str, Any]:
+        """创建架构文档"""
+        return _make_result("architecture_document", f"# {content}{_ARCHITECTURE_DOCUMENT_BODY}")
+    
+    def _create_architecture_framework(self, content: str) -> Dict[str, Any]:
+        """创建架构代码框架"""
+        return _make_result("architecture_framework", _ARCHITECTURE_FRAMEWORK_CODE)
+    
+    def _create_design_tool(self, content: str) -> Dict[str, Any]:
+        """创建设计工具"""
+        return _make_result("design_tool", _DESIGN_TOOL_CODE)
+    
+    def _create_requirement_prototype(self, content: str) -> Dict[str, Any]:
+        """创建需求原型"""
+        return _make_result("requirement_prototype", f"# {content}{_REQUIREMENT_PROTOTYPE_BODY}")
+    
+    def _create_analysis_tool(self, content: str) -> Dict[str, Any]:
+        """创建分析工具"""
+        return _make_result("analysis_tool", _ANALYSIS_TOOL_CODE)
+    
+    def _create_web_application(self, content: str) -> Dict[str, Any]:
+        """创建Web应用"""
+        return _make_result("web_application", _WEB_APPLICATION_CODE)
+    
+    def _create_game_application(self, content: str) -> Dict[str, Any]:
+        """创建游戏应用"""
+        return _make_result("game_application", _GAME_APPLICATION_CODE)
+    
+    def _generate_ppt_structure(self, content: str) -> str:
+        """生成PPT基础结构"""
+        return _PPT_TEMPLATE.substitute(
+            content=content,
+            date=_today_str()
+        )
     
     async def _create_general_code(self, content: str) -> Dict[str, Any]:
         """创建通用代码解决方案"""
@@ -525,64 +769,35 @@ if __name__ == "__main__":
                 "content": content,
                 "language": "python"
             }
-            ai_result = await self.coordinator.send_request(ai_request)
+            ai_result = await self._send_ai_request(ai_request)
             
             if ai_result.get('success'):
-                return {
-                    "success": True,
-                    "type": "code_solution",
-                    "content": ai_result.get('content'),
-                    "language": "python",
-                    "created_by": "kilocode_mcp",
-                    "ai_assisted": True
-                }
+                return _make_result(
+                    "code_solution", ai_result.get('content'),
+                    language="python", ai_assisted=True
+                )
         
-        # 兜底方案
-        return {
-            "success": True,
-            "type": "code_template",
-            "content": f"# {content}\n# TODO: 实现具体功能\n\ndef main():\n    print('Hello, World!')\n\nif __name__ == '__main__':\n    main()",
-            "language": "python",
-            "created_by": "kilocode_mcp",
-            "ai_assisted": False
-        }
-    
-    async def _create_test_solution(self, content: str) -> Dict[str, Any]:
-        """创建测试解决方案"""
-        return {
-            "success": True,
-            "type": "test_framework",
-            "content": "# 测试框架模板\nimport unittest\n\nclass TestCase(unittest.TestCase):\n    def test_example(self):\n        self.assertTrue(True)",
-            "created_by": "kilocode_mcp"
-        }
+        return self._create_fallback_general_code(content)
     
-    async def _create_deployment_solution(self, content: str) -> Dict[str, Any]:
-        """创建部署解决方案"""
-        return {
-            "success": True,
-            "type": "deployment_script",
-            "content": "#!/bin/bash\n# 部署脚本模板\necho '开始部署...'\n# TODO: 添加部署逻辑",
-            "created_by": "kilocode_mcp"
-        }
-    
-    async def _create_monitoring_solution(self, content: str) -> Dict[str, Any]:
-        """创建监控解决方案"""
-        return {
-            "success": True,
-            "type": "monitoring_tool",
-            "content": "# 监控工具模板\nimport time\n\ndef monitor():\n    while True:\n        print('系统运行正常')\n        time.sleep(60)",
-            "created_by": "kilocode_mcp"
-        }
+    def _create_fallback_general_code(self, content: str) -> Dict[str, Any]:
+        """兜底方案：通用代码模板"""
+        return _make_result(
+            "code_template", f"# {content}{_GENERAL_CODE_BODY}",
+            language="python", ai_assisted=False
+        )
     
     def _create_generic_solution(self, request: Dict[str, Any]) -> Dict[str, Any]:
         """创建通用解决方案"""
-        return {
-            "success": True,
-            "type": "generic_solution",
-            "content": f"针对请求 '{request.get('content', '')}' 的通用解决方案",
-            "created_by": "kilocode_mcp",
-            "note": "这是一个通用兜底方案，建议提供更多上下文信息以获得更好的解决方案"
-        }
+        return _make_result(
+            "generic_solution", f"针对请求 '{request.get('content', '')}' 的通用解决方案",
+            note="这是一个通用兜底方案，建议提供更多上下文信息以获得更好的解决方案"
+        )
+
+def _dumps_result(result: Dict[str, Any]) -> str:
+    """格式化CLI输出，优先使用orjson"""
+    if orjson is not None:
+        return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode('utf-8')
+    return json.dumps(result, indent=2, ensure_ascii=False)
 
 # CLI接口
 async def main():
@@ -615,7 +830,7 @@ async def main():
         }
         
         result = await mcp.process_request(request)
-        print(json.dumps(result, indent=2, ensure_ascii=False))
+        print(_dumps_result(result))
         
     elif command == "test":
         print("运行KiloCode MCP测试...")
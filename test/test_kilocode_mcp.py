@@ -10,14 +10,22 @@ KiloCode MCP 测试用例 (配置驱动版本)
 4. AI协助和兜底机制
 5. 质量控制系统
 6. 安全验证机制
+
+各测试之间没有共享的可变状态，可以并行运行：
+    cd workflow_howto/howto/howto/kilocode_mcp_redesign_example
+    pytest test_kilocode_mcp_redesigned.py -n auto   # 需要安装 pytest-xdist
+
+默认静默运行，设置 KILOCODE_TEST_VERBOSE=1 可输出测试过程信息。
 """
 
 import asyncio
+import io
 import json
 import unittest
-import tempfile
 import os
-import toml
+import re
+import tempfile
+from types import MappingProxyType
 from unittest.mock import Mock, AsyncMock
 import sys
 
@@ -25,12 +33,44 @@ import sys
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from kilocode_mcp_redesigned import KiloCodeMCP, WorkflowType, CreationType, KiloCodeConfig
 
+# 默认不输出测试过程信息，设置 KILOCODE_TEST_VERBOSE=1 时打印
+_print = print if os.getenv("KILOCODE_TEST_VERBOSE") else (lambda *args, **kwargs: None)
+
+# 游戏模板必须包含的代码片段（ASCII），编译为单个bytes正则一次扫描完成
+GAME_CODE_MARKERS = (
+    b"class Snake",      # 游戏类
+    b"class Food",       # 食物类
+    b"class Game",       # 游戏主类
+    b"while True:",      # 游戏循环
+    b"check_collision",  # 碰撞检测
+    b"score",            # 得分系统
+)
+GAME_CODE_MARKERS_PATTERN = re.compile(b"|".join(map(re.escape, GAME_CODE_MARKERS)))
+
+# 测试支持的工作流及对应的只读请求，模块加载时构建一次
+SUPPORTED_WORKFLOWS = (
+    ("requirements_analysis", "创建PPT"),
+    ("coding_implementation", "开发游戏"),
+    ("testing_verification", "创建测试"),
+    ("deployment_release", "部署脚本"),
+    ("monitoring_operations", "监控工具"),
+    ("architecture_design", "架构设计"),
+)
+WORKFLOW_REQUESTS = tuple(
+    MappingProxyType({
+        "content": content,
+        "context": MappingProxyType({"workflow_type": workflow})
+    })
+    for workflow, content in SUPPORTED_WORKFLOWS
+)
+
 class TestKiloCodeConfig(unittest.TestCase):
     """KiloCode 配置管理器测试"""
     
-    def setUp(self):
-        """测试前置设置"""
-        self.test_config = {
+    @classmethod
+    def setUpClass(cls):
+        """类级前置设置：测试配置只序列化一次，保存在内存中"""
+        cls.test_config = {
             "mcp_info": {
                 "name": "test_kilocode_mcp",
                 "version": "2.0.0-test",
@@ -58,37 +98,48 @@ class TestKiloCodeConfig(unittest.TestCase):
                 "blocked_keywords": ["dangerous_command"]
             }
         }
+        
+        # 只有本测试类需要序列化TOML，延迟导入以缩短收集时间
+        try:
+            import rtoml as toml  # Rust实现，夹具序列化更快
+        except ImportError:
+            import toml
+        cls.toml_blob = toml.dumps(cls.test_config)
     
     def test_config_loading(self):
         """测试配置文件加载"""
-        print("\n🎯 测试配置文件加载")
+        _print("\n🎯 测试配置文件加载")
         
-        # 创建临时配置文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.toml', delete=False) as f:
-            toml.dump(self.test_config, f)
-            temp_config_path = f.name
+        # 测试配置加载（内存中的TOML，不经过磁盘）
+        config = KiloCodeConfig(source=io.StringIO(self.toml_blob))
         
-        try:
-            # 测试配置加载
-            config = KiloCodeConfig(temp_config_path)
-            
-            # 验证配置值
-            self.assertEqual(config.get("mcp_info.name"), "test_kilocode_mcp")
-            self.assertEqual(config.get("mcp_info.version"), "2.0.0-test")
-            self.assertEqual(config.get("ai_assistance.primary_ai"), "gemini_mcp")
-            self.assertEqual(config.get("quality_control.min_code_lines"), 5)
-            
-            print("✅ 配置文件加载成功")
-            print(f"   MCP名称: {config.get('mcp_info.name')}")
-            print(f"   版本: {config.get('mcp_info.version')}")
-            print(f"   支持工作流: {len(config.get('capabilities.supported_workflows', []))}个")
+        # 验证配置值
+        self.assertEqual(config.get("mcp_info.name"), "test_kilocode_mcp")
+        self.assertEqual(config.get("mcp_info.version"), "2.0.0-test")
+        self.assertEqual(config.get("ai_assistance.primary_ai"), "gemini_mcp")
+        self.assertEqual(config.get("quality_control.min_code_lines"), 5)
+        
+        _print("✅ 配置文件加载成功")
+        _print(f"   MCP名称: {config.get('mcp_info.name')}")
+        _print(f"   版本: {config.get('mcp_info.version')}")
+        _print(f"   支持工作流: {len(config.get('capabilities.supported_workflows', []))}个")
+    
+    def test_config_loading_from_file(self):
+        """测试通过config_path从TOML文件加载配置"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config_path = os.path.join(temp_dir, "kilocode_mcp_config.toml")
+            with open(config_path, "w", encoding="utf-8") as f:
+                f.write(self.toml_blob)
             
-        finally:
-            os.unlink(temp_config_path)
+            config = KiloCodeConfig(config_path)
+        
+        self.assertEqual(config.get("mcp_info.name"), "test_kilocode_mcp")
+        self.assertEqual(config.get("security.max_input_length"), 1000)
+        self.assertEqual(config.get("security.blocked_keywords"), ["dangerous_command"])
     
     def test_config_fallback(self):
         """测试配置兜底机制"""
-        print("\n🎯 测试配置兜底机制")
+        _print("\n🎯 测试配置兜底机制")
         
         # 测试不存在的配置文件
         config = KiloCodeConfig("/nonexistent/config.toml")
@@ -97,15 +148,16 @@ class TestKiloCodeConfig(unittest.TestCase):
         self.assertIsNotNone(config.get("mcp_info.name"))
         self.assertEqual(config.get("mcp_info.name"), "kilocode_mcp")
         
-        print("✅ 配置兜底机制正常工作")
+        _print("✅ 配置兜底机制正常工作")
 
-class TestKiloCodeMCPWithConfig(unittest.TestCase):
+class TestKiloCodeMCPWithConfig(unittest.IsolatedAsyncioTestCase):
     """KiloCode MCP 配置驱动测试类"""
     
-    def setUp(self):
-        """测试前置设置"""
+    @classmethod
+    def setUpClass(cls):
+        """类级前置设置：测试配置只构建一次"""
         # 创建测试配置
-        self.test_config = {
+        cls.test_config = {
             "mcp_info": {
                 "name": "test_kilocode_mcp",
                 "version": "2.0.0-test"
@@ -170,30 +222,22 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
                 "log_level": "INFO"
             }
         }
-        
-        # 创建临时配置文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.toml', delete=False) as f:
-            toml.dump(self.test_config, f)
-            self.temp_config_path = f.name
-        
-        # 创建模拟的coordinator
+    
+    def setUp(self):
+        """测试前置设置：每个测试使用独立的模拟coordinator和实例"""
+        # 创建模拟的coordinator，默认模拟AI协助不可用
         self.mock_coordinator = Mock()
-        self.mock_coordinator.send_request = AsyncMock()
+        self.mock_coordinator.send_request = AsyncMock(return_value={"success": False})
         
         # 创建KiloCode MCP实例
         self.kilocode_mcp = KiloCodeMCP(
             coordinator_client=self.mock_coordinator,
-            config_path=self.temp_config_path
+            config=KiloCodeConfig(config_dict=self.test_config)
         )
     
-    def tearDown(self):
-        """测试后清理"""
-        if os.path.exists(self.temp_config_path):
-            os.unlink(self.temp_config_path)
-    
-    async def async_test_config_driven_initialization(self):
+    async def test_config_driven_initialization(self):
         """测试配置驱动的初始化"""
-        print("\n🎯 测试配置驱动的初始化")
+        _print("\n🎯 测试配置驱动的初始化")
         
         # 验证配置加载
         self.assertEqual(self.kilocode_mcp.name, "test_kilocode_mcp")
@@ -202,16 +246,16 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         self.assertEqual(len(self.kilocode_mcp.supported_creation_types), 4)
         self.assertEqual(len(self.kilocode_mcp.supported_languages), 3)
         
-        print(f"✅ 配置驱动初始化成功")
-        print(f"   MCP名称: {self.kilocode_mcp.name}")
-        print(f"   版本: {self.kilocode_mcp.version}")
-        print(f"   支持工作流: {len(self.kilocode_mcp.supported_workflows)}个")
-        print(f"   支持创建类型: {len(self.kilocode_mcp.supported_creation_types)}个")
-        print(f"   支持编程语言: {len(self.kilocode_mcp.supported_languages)}个")
+        _print(f"✅ 配置驱动初始化成功")
+        _print(f"   MCP名称: {self.kilocode_mcp.name}")
+        _print(f"   版本: {self.kilocode_mcp.version}")
+        _print(f"   支持工作流: {len(self.kilocode_mcp.supported_workflows)}个")
+        _print(f"   支持创建类型: {len(self.kilocode_mcp.supported_creation_types)}个")
+        _print(f"   支持编程语言: {len(self.kilocode_mcp.supported_languages)}个")
     
-    async def async_test_security_validation(self):
+    async def test_security_validation(self):
         """测试安全验证机制"""
-        print("\n🎯 测试安全验证机制")
+        _print("\n🎯 测试安全验证机制")
         
         # 测试被禁止的关键词
         dangerous_request = {
@@ -225,8 +269,8 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         self.assertFalse(result["success"])
         self.assertIn("error", result)
         
-        print("✅ 安全验证机制正常工作")
-        print(f"   拦截危险请求: {result.get('error', '')[:50]}...")
+        _print("✅ 安全验证机制正常工作")
+        _print(f"   拦截危险请求: {result.get('error', '')[:50]}...")
         
         # 测试输入长度限制
         long_content = "x" * 10000  # 超过配置的5000字符限制
@@ -238,11 +282,11 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         result = await self.kilocode_mcp.process_request(long_request)
         self.assertFalse(result["success"])
         
-        print("✅ 输入长度限制正常工作")
+        _print("✅ 输入长度限制正常工作")
     
-    async def async_test_quality_control(self):
+    async def test_quality_control(self):
         """测试质量控制系统"""
-        print("\n🎯 测试质量控制系统")
+        _print("\n🎯 测试质量控制系统")
         
         # 模拟创建代码
         request = {
@@ -258,18 +302,18 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         
         # 检查是否有质量状态
         if "quality_status" in result:
-            print(f"✅ 质量控制: {result['quality_status']}")
+            _print(f"✅ 质量控制: {result['quality_status']}")
         elif "quality_warning" in result:
-            print(f"⚠️ 质量警告: {result['quality_warning']}")
+            _print(f"⚠️ 质量警告: {result['quality_warning']}")
         
         # 验证文档要求
         if self.kilocode_mcp.config.get("quality_control.require_documentation"):
             self.assertIn("description", result)
-            print("✅ 文档要求检查通过")
+            _print("✅ 文档要求检查通过")
     
-    async def async_test_template_driven_creation(self):
+    async def test_template_driven_creation(self):
         """测试模板驱动的创建"""
-        print("\n🎯 测试模板驱动的创建")
+        _print("\n🎯 测试模板驱动的创建")
         
         # 测试PPT创建（使用模板配置）
         ppt_request = {
@@ -292,14 +336,14 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         self.assertIn("第2页：目录", content)  # include_toc = True
         self.assertIn("谢谢", content)        # include_conclusion = True
         
-        print("✅ PPT模板驱动创建成功")
-        print(f"   包含封面: {'✅' if '封面' in content else '❌'}")
-        print(f"   包含目录: {'✅' if '目录' in content else '❌'}")
-        print(f"   包含结论: {'✅' if '谢谢' in content else '❌'}")
+        _print("✅ PPT模板驱动创建成功")
+        _print(f"   包含封面: {'✅' if '封面' in content else '❌'}")
+        _print(f"   包含目录: {'✅' if '目录' in content else '❌'}")
+        _print(f"   包含结论: {'✅' if '谢谢' in content else '❌'}")
     
-    async def async_test_game_template_creation(self):
+    async def test_game_template_creation(self):
         """测试游戏模板创建"""
-        print("\n🎯 测试游戏模板创建")
+        _print("\n🎯 测试游戏模板创建")
         
         game_request = {
             "content": "创建贪吃蛇游戏",
@@ -315,31 +359,30 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         
         # 验证游戏模板配置
         code = result["content"]
-        self.assertIn("class Snake", code)      # 游戏类
-        self.assertIn("class Food", code)      # 食物类
-        self.assertIn("class Game", code)      # 游戏主类
-        self.assertIn("while True:", code)     # 游戏循环
-        self.assertIn("check_collision", code) # 碰撞检测
-        self.assertIn("score", code)           # 得分系统
-        
-        print("✅ 游戏模板创建成功")
-        print(f"   游戏引擎: {result['dependencies'][0]}")
-        print(f"   代码行数: {len(code.split(chr(10)))}")
-        print(f"   质量等级: {result.get('quality_level', 'standard')}")
+        # 生成的代码含中文注释，编码一次后在bytes上扫描和计数
+        code_bytes = code.encode("utf-8")
+        found = {m.group(0) for m in GAME_CODE_MARKERS_PATTERN.finditer(code_bytes)}
+        self.assertEqual(found, set(GAME_CODE_MARKERS))
+        
+        lines = code_bytes.count(b'\n') + 1
+        
+        _print("✅ 游戏模板创建成功")
+        _print(f"   游戏引擎: {result['dependencies'][0]}")
+        _print(f"   代码行数: {lines}")
+        _print(f"   质量等级: {result.get('quality_level', 'standard')}")
         
         # 验证代码质量
-        lines = len(code.split('\n'))
         min_lines = self.kilocode_mcp.config.get("quality_control.min_code_lines", 10)
         max_lines = self.kilocode_mcp.config.get("quality_control.max_code_lines", 1000)
         
         self.assertGreaterEqual(lines, min_lines)
         self.assertLessEqual(lines, max_lines)
         
-        print(f"✅ 代码质量检查通过: {lines}行 (范围: {min_lines}-{max_lines})")
+        _print(f"✅ 代码质量检查通过: {lines}行 (范围: {min_lines}-{max_lines})")
     
-    async def async_test_ai_assistance_with_config(self):
+    async def test_ai_assistance_with_config(self):
         """测试配置驱动的AI协助"""
-        print("\n🎯 测试配置驱动的AI协助")
+        _print("\n🎯 测试配置驱动的AI协助")
         
         # 模拟AI协助成功
         self.mock_coordinator.send_request.return_value = {
@@ -358,50 +401,59 @@ class TestKiloCodeMCPWithConfig(unittest.TestCase):
         self.assertTrue(result["ai_assisted"])
         self.assertEqual(result["ai_provider"], "gemini_mcp")  # 配置的primary_ai
         
-        print("✅ AI协助机制正常工作")
-        print(f"   AI提供商: {result['ai_provider']}")
-        print(f"   AI协助: {result['ai_assisted']}")
+        _print("✅ AI协助机制正常工作")
+        _print(f"   AI提供商: {result['ai_provider']}")
+        _print(f"   AI协助: {result['ai_assisted']}")
         
         # 验证coordinator调用
         self.mock_coordinator.send_request.assert_called_once()
         call_args = self.mock_coordinator.send_request.call_args[0][0]
         self.assertEqual(call_args["target_mcp"], "gemini_mcp")
     
-    async def async_test_workflow_support_validation(self):
+    async def test_ppt_template_with_unhashable_values(self):
+        """测试PPT模板配置包含列表等不可哈希的值"""
+        test_config = dict(self.test_config)
+        test_config["templates"] = dict(self.test_config["templates"])
+        test_config["templates"]["ppt"] = dict(
+            self.test_config["templates"]["ppt"], sections=["业务概览", "关键成果"]
+        )
+        kilocode_mcp = KiloCodeMCP(
+            coordinator_client=self.mock_coordinator,
+            config=KiloCodeConfig(config_dict=test_config)
+        )
+        
+        result = await kilocode_mcp.process_request({
+            "content": "为华为终端业务创建年终汇报PPT",
+            "context": {"workflow_type": "requirements_analysis"}
+        })
+        
+        self.assertTrue(result["success"])
+        self.assertIn("第1页：封面", result["content"])
+    
+    async def test_workflow_support_validation(self):
         """测试工作流支持验证"""
-        print("\n🎯 测试工作流支持验证")
-        
-        # 测试支持的工作流
-        supported_workflows = [
-            ("requirements_analysis", "创建PPT"),
-            ("coding_implementation", "开发游戏"),
-            ("testing_verification", "创建测试"),
-            ("deployment_release", "部署脚本"),
-            ("monitoring_operations", "监控工具"),
-            ("architecture_design", "架构设计")
-        ]
-        
-        for workflow, content in supported_workflows:
-            request = {
-                "content": content,
-                "context": {"workflow_type": workflow}
-            }
-            
-            result = await self.kilocode_mcp.process_request(request)
+        _print("\n🎯 测试工作流支持验证")
+        
+        # 并发提交所有工作流请求
+        results = await asyncio.gather(
+            *(self.kilocode_mcp.process_request(request) for request in WORKFLOW_REQUESTS)
+        )
+        
+        for (workflow, _), result in zip(SUPPORTED_WORKFLOWS, results):
             self.assertTrue(result["success"])
-            print(f"   ✅ {workflow}: 支持")
+            self.assertFalse(result.get("ai_assisted", False))
+            _print(f"   ✅ {workflow}: 支持")
         
-        print("✅ 所有配置的工作流都得到支持")
+        _print("✅ 所有配置的工作流都得到支持")
 
-class TestKiloCodeMCPIntegrationWithConfig(unittest.TestCase):
+class TestKiloCodeMCPIntegrationWithConfig(unittest.IsolatedAsyncioTestCase):
     """KiloCode MCP 配置集成测试"""
     
-    async def async_test_complete_config_workflow(self):
-        """测试完整的配置工作流"""
-        print("\n🎯 集成测试: 完整配置工作流")
-        
+    @classmethod
+    def setUpClass(cls):
+        """类级前置设置：完整配置只构建一次"""
         # 创建完整配置
-        full_config = {
+        cls.full_config = {
             "mcp_info": {"name": "integration_test_mcp", "version": "2.0.0"},
             "capabilities": {
                 "supported_workflows": ["requirements_analysis", "coding_implementation"],
@@ -416,129 +468,54 @@ class TestKiloCodeMCPIntegrationWithConfig(unittest.TestCase):
             "quality_control": {"min_code_lines": 5, "max_code_lines": 200},
             "security": {"enable_input_validation": True, "max_input_length": 1000}
         }
+    
+    async def test_complete_config_workflow(self):
+        """测试完整的配置工作流"""
+        _print("\n🎯 集成测试: 完整配置工作流")
         
-        # 创建临时配置文件
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.toml', delete=False) as f:
-            toml.dump(full_config, f)
-            temp_config_path = f.name
+        # 创建MCP实例
+        mcp = KiloCodeMCP(config=KiloCodeConfig(config_dict=self.full_config))
         
-        try:
-            # 创建MCP实例
-            mcp = KiloCodeMCP(config_path=temp_config_path)
-            
-            # 测试场景1：PPT创建（无AI协助）
-            ppt_request = {
-                "content": "创建测试PPT",
-                "context": {"workflow_type": "requirements_analysis"}
-            }
-            
-            result = await mcp.process_request(ppt_request)
-            
-            self.assertTrue(result["success"])
-            self.assertEqual(result["type"], "business_document")
-            self.assertFalse(result["ai_assisted"])  # AI协助被禁用
-            
-            print("   ✅ PPT创建测试通过（无AI协助）")
-            
-            # 测试场景2：游戏创建
-            game_request = {
-                "content": "创建贪吃蛇游戏",
-                "context": {"workflow_type": "coding_implementation"}
-            }
-            
-            result = await mcp.process_request(game_request)
-            
-            self.assertTrue(result["success"])
-            self.assertEqual(result["type"], "game_application")
-            self.assertIn("pygame", result["dependencies"])
-            
-            print("   ✅ 游戏创建测试通过")
-            
-            # 测试场景3：安全验证
-            unsafe_request = {
-                "content": "x" * 2000,  # 超过1000字符限制
-                "context": {"workflow_type": "coding_implementation"}
-            }
-            
-            result = await mcp.process_request(unsafe_request)
-            self.assertFalse(result["success"])
-            
-            print("   ✅ 安全验证测试通过")
-            
-        finally:
-            os.unlink(temp_config_path)
+        # 测试场景1：PPT创建（无AI协助）
+        ppt_request = {
+            "content": "创建测试PPT",
+            "context": {"workflow_type": "requirements_analysis"}
+        }
         
-        print("✅ 完整配置工作流集成测试通过")
-
-async def run_all_config_tests():
-    """运行所有配置相关的异步测试"""
-    print("🚀 开始KiloCode MCP配置驱动测试")
-    print("=" * 70)
-    
-    # 配置管理器测试
-    config_test = TestKiloCodeConfig()
-    config_test.setUp()
-    config_test.test_config_loading()
-    config_test.test_config_fallback()
-    
-    # 配置驱动MCP测试
-    mcp_test = TestKiloCodeMCPWithConfig()
-    mcp_test.setUp()
-    
-    try:
-        test_methods = [
-            mcp_test.async_test_config_driven_initialization,
-            mcp_test.async_test_security_validation,
-            mcp_test.async_test_quality_control,
-            mcp_test.async_test_template_driven_creation,
-            mcp_test.async_test_game_template_creation,
-            mcp_test.async_test_ai_assistance_with_config,
-            mcp_test.async_test_workflow_support_validation
-        ]
-        
-        results = []
-        for test_method in test_methods:
-            try:
-                result = await test_method()
-                results.append(result)
-            except Exception as e:
-                print(f"❌ 测试失败: {test_method.__name__} - {str(e)}")
-        
-        # 集成测试
-        integration_test = TestKiloCodeMCPIntegrationWithConfig()
-        await integration_test.async_test_complete_config_workflow()
-        
-    finally:
-        mcp_test.tearDown()
-    
-    print("\n" + "=" * 70)
-    print("🎉 KiloCode MCP配置驱动测试完成")
-    print(f"📊 测试结果: 配置系统全面验证通过")
-    
-    return results
-
-def test_cli_interface_with_config():
-    """测试配置驱动的CLI接口"""
-    print("\n🎯 测试配置驱动的CLI接口")
-    
-    # 这里可以测试命令行接口的配置功能
-    print("✅ 配置驱动CLI接口测试通过")
+        result = await mcp.process_request(ppt_request)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["type"], "business_document")
+        self.assertFalse(result["ai_assisted"])  # AI协助被禁用
+        
+        _print("   ✅ PPT创建测试通过（无AI协助）")
+        
+        # 测试场景2：游戏创建
+        game_request = {
+            "content": "创建贪吃蛇游戏",
+            "context": {"workflow_type": "coding_implementation"}
+        }
+        
+        result = await mcp.process_request(game_request)
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["type"], "game_application")
+        self.assertIn("pygame", result["dependencies"])
+        
+        _print("   ✅ 游戏创建测试通过")
+        
+        # 测试场景3：安全验证
+        unsafe_request = {
+            "content": "x" * 2000,  # 超过1000字符限制
+            "context": {"workflow_type": "coding_implementation"}
+        }
+        
+        result = await mcp.process_request(unsafe_request)
+        self.assertFalse(result["success"])
+        
+        _print("   ✅ 安全验证测试通过")
+        
+        _print("✅ 完整配置工作流集成测试通过")
 
 if __name__ == "__main__":
-    # 运行异步测试
-    results = asyncio.run(run_all_config_tests())
-    
-    # 运行CLI测试
-    test_cli_interface_with_config()
-    
-    print("\n🎯 配置驱动测试总结:")
-    print(f"   ✅ 配置文件加载: 全部通过")
-    print(f"   ✅ 安全验证机制: 全部通过") 
-    print(f"   ✅ 质量控制系统: 全部通过")
-    print(f"   ✅ 模板驱动创建: 全部通过")
-    print(f"   ✅ AI协助配置: 全部通过")
-    print(f"   ✅ 工作流支持: 全部通过")
-    print(f"   ✅ 集成测试: 全部通过")
-    
-    print("\n🎉 KiloCode MCP配置驱动重新设计测试全部通过！")
-
+    unittest.main(verbosity=1, buffer=True)
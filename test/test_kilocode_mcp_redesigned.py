@@ -10,32 +10,79 @@ KiloCode MCP 测试用例
 4. 测试验证工作流 - 测试脚本兜底
 5. 部署发布工作流 - 部署脚本兜底
 6. 监控运维工作流 - 监控工具兜底
+
+各测试之间相互独立，可以并行运行：
+    pytest test_kilocode_mcp_redesigned.py -n auto   # 需要安装 pytest-xdist
 """
 
 import asyncio
+import io
 import json
+import logging
 import unittest
-from unittest.mock import Mock, AsyncMock
+from contextlib import redirect_stdout
+from operator import itemgetter
+from unittest.mock import Mock, AsyncMock, patch
 import sys
 import os
 
 # 添加路径以导入kilocode_mcp
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-from kilocode_mcp_redesigned import KiloCodeMCP, WorkflowType, CreationType
+from kilocode_mcp_redesigned import (
+    KiloCodeMCP, WorkflowType, CreationType, _BufferedLogHandler, main as cli_main
+)
+
+# 代码类结果中需要逐项校验的字段
+_CODE_RESULT_FIELDS = itemgetter("type", "language", "dependencies", "content")
+
+# 内容包含该标记的AI请求模拟为服务不可用
+AI_UNAVAILABLE_MARKER = "复杂的业务分析报告"
+
+def route_ai_request(ai_request):
+    """模拟coordinator：按请求内容返回响应，测试之间无需修改共享的return_value"""
+    if AI_UNAVAILABLE_MARKER in ai_request.get("content", ""):
+        return {"success": False, "error": "AI服务不可用"}
+    return {"success": True, "content": "华为终端业务年终汇报PPT内容..."}
 
-class TestKiloCodeMCP(unittest.TestCase):
+def tearDownModule():
+    """写出缓冲中的日志，避免进程退出时才写入测试运行器已关闭的输出流"""
+    for handler in logging.getLogger("kilocode_mcp").handlers:
+        handler.flush()
+
+class TestKiloCodeMCP(unittest.IsolatedAsyncioTestCase):
     """KiloCode MCP 测试类"""
     
     def setUp(self):
         """测试前置设置"""
         # 创建模拟的coordinator
         self.mock_coordinator = Mock()
-        self.mock_coordinator.send_request = AsyncMock()
+        self.mock_coordinator.send_request = AsyncMock(side_effect=route_ai_request)
         
         # 创建KiloCode MCP实例
         self.kilocode_mcp = KiloCodeMCP(coordinator_client=self.mock_coordinator)
     
-    async def async_test_requirements_analysis_workflow(self):
+    async def test_workflow_strategies_mapping(self):
+        """测试类级别共享的只读工作流策略映射"""
+        strategies = self.kilocode_mcp.workflow_strategies
+        self.assertIs(strategies, KiloCodeMCP.workflow_strategies)
+        self.assertEqual(set(strategies), set(WorkflowType))
+        with self.assertRaises(TypeError):
+            strategies[WorkflowType.CODING_IMPLEMENTATION] = None
+        
+        request = {"content": "创建自动化部署脚本", "context": {}}
+        result = await strategies[WorkflowType.DEPLOYMENT_RELEASE](self.kilocode_mcp, request, CreationType.CODE)
+        self.assertEqual(result["type"], "deployment_script")
+
+    async def test_instance_uses_closed_slots(self):
+        """测试实例只使用槽位存储，方法补丁打在类上"""
+        self.assertFalse(hasattr(self.kilocode_mcp, "__dict__"))
+        with self.assertRaises(AttributeError):
+            self.kilocode_mcp.extra_attribute = True
+        
+        with patch.object(KiloCodeMCP, "_create_generic_solution", Mock(return_value={"type": "patched"})):
+            self.assertEqual(self.kilocode_mcp._create_generic_solution({})["type"], "patched")
+
+    async def test_requirements_analysis_workflow(self):
         """测试需求分析工作流的兜底机制"""
         print("\n🎯 测试场景1: 需求分析工作流 - PPT生成兜底")
         
@@ -49,12 +96,6 @@ class TestKiloCodeMCP(unittest.TestCase):
             }
         }
         
-        # 模拟AI协助成功
-        self.mock_coordinator.send_request.return_value = {
-            "success": True,
-            "content": "华为终端业务年终汇报PPT内容..."
-        }
-        
         result = await self.kilocode_mcp.process_request(request)
         
         # 验证结果
@@ -66,10 +107,8 @@ class TestKiloCodeMCP(unittest.TestCase):
         print(f"✅ 需求分析兜底成功: {result['type']}")
         print(f"   AI协助: {result['ai_assisted']}")
         print(f"   内容预览: {str(result['content'])[:100]}...")
-        
-        return result
     
-    async def async_test_coding_implementation_workflow(self):
+    async def test_coding_implementation_workflow(self):
         """测试编码实现工作流的兜底机制"""
         print("\n🎯 测试场景2: 编码实现工作流 - 贪吃蛇游戏兜底")
         
@@ -87,19 +126,18 @@ class TestKiloCodeMCP(unittest.TestCase):
         
         # 验证结果
         self.assertTrue(result["success"])
-        self.assertEqual(result["type"], "game_application")
-        self.assertEqual(result["language"], "python")
-        self.assertIn("pygame", result["dependencies"])
-        self.assertIn("class Snake", result["content"])
-        
-        print(f"✅ 编码实现兜底成功: {result['type']}")
-        print(f"   编程语言: {result['language']}")
-        print(f"   依赖项: {result['dependencies']}")
-        print(f"   代码行数: {len(result['content'].split(chr(10)))}")
-        
-        return result
+        result_type, language, dependencies, content = _CODE_RESULT_FIELDS(result)
+        self.assertEqual(result_type, "game_application")
+        self.assertEqual(language, "python")
+        self.assertIn("pygame", dependencies)
+        self.assertIn("class Snake", content)
+        
+        print(f"✅ 编码实现兜底成功: {result_type}")
+        print(f"   编程语言: {language}")
+        print(f"   依赖项: {dependencies}")
+        print(f"   代码行数: {content.count(chr(10)) + 1}")
     
-    async def async_test_architecture_design_workflow(self):
+    async def test_architecture_design_workflow(self):
         """测试架构设计工作流的兜底机制"""
         print("\n🎯 测试场景3: 架构设计工作流 - 架构设计兜底")
         
@@ -116,10 +154,8 @@ class TestKiloCodeMCP(unittest.TestCase):
         
         self.assertTrue(result["success"])
         print(f"✅ 架构设计兜底成功: {result['type']}")
-        
-        return result
     
-    async def async_test_testing_verification_workflow(self):
+    async def test_testing_verification_workflow(self):
         """测试测试验证工作流的兜底机制"""
         print("\n🎯 测试场景4: 测试验证工作流 - 测试脚本兜底")
         
@@ -138,10 +174,8 @@ class TestKiloCodeMCP(unittest.TestCase):
         self.assertEqual(result["type"], "test_framework")
         
         print(f"✅ 测试验证兜底成功: {result['type']}")
-        
-        return result
     
-    async def async_test_deployment_release_workflow(self):
+    async def test_deployment_release_workflow(self):
         """测试部署发布工作流的兜底机制"""
         print("\n🎯 测试场景5: 部署发布工作流 - 部署脚本兜底")
         
@@ -160,10 +194,8 @@ class TestKiloCodeMCP(unittest.TestCase):
         self.assertEqual(result["type"], "deployment_script")
         
         print(f"✅ 部署发布兜底成功: {result['type']}")
-        
-        return result
     
-    async def async_test_monitoring_operations_workflow(self):
+    async def test_monitoring_operations_workflow(self):
         """测试监控运维工作流的兜底机制"""
         print("\n🎯 测试场景6: 监控运维工作流 - 监控工具兜底")
         
@@ -182,10 +214,8 @@ class TestKiloCodeMCP(unittest.TestCase):
         self.assertEqual(result["type"], "monitoring_tool")
         
         print(f"✅ 监控运维兜底成功: {result['type']}")
-        
-        return result
     
-    async def async_test_workflow_type_detection(self):
+    async def test_workflow_type_detection(self):
         """测试工作流类型自动检测"""
         print("\n🎯 测试场景7: 工作流类型自动检测")
         
@@ -199,15 +229,21 @@ class TestKiloCodeMCP(unittest.TestCase):
         ]
         
         for content, expected_workflow in test_cases:
-            request = {"content": content, "context": {}}
-            detected_workflow = self.kilocode_mcp._parse_workflow_type(request)
-            
-            self.assertEqual(detected_workflow, expected_workflow)
-            print(f"   ✅ '{content}' → {detected_workflow.value}")
+            with self.subTest(content=content):
+                request = {"content": content, "context": {}}
+                detected_workflow = self.kilocode_mcp._parse_workflow_type(request)
+                
+                self.assertEqual(detected_workflow, expected_workflow)
+                print(f"   ✅ '{content}' → {detected_workflow.value}")
         
         print("✅ 工作流类型检测全部正确")
-    
-    async def async_test_creation_type_detection(self):
+
+    async def test_workflow_hint_with_multiple_types(self):
+        """测试上下文提示包含多个类型值时按枚举顺序取优先级最高者"""
+        request = {"content": "", "context": {"workflow_type": "deployment_release x requirements_analysis"}}
+        self.assertEqual(self.kilocode_mcp._parse_workflow_type(request), WorkflowType.REQUIREMENTS_ANALYSIS)
+
+    async def test_creation_type_detection(self):
         """测试创建类型自动检测"""
         print("\n🎯 测试场景8: 创建类型自动检测")
         
@@ -219,24 +255,20 @@ class TestKiloCodeMCP(unittest.TestCase):
         ]
         
         for content, expected_type in test_cases:
-            request = {"content": content, "context": {}}
-            detected_type = self.kilocode_mcp._determine_creation_type(request)
-            
-            self.assertEqual(detected_type, expected_type)
-            print(f"   ✅ '{content}' → {expected_type.value}")
+            with self.subTest(content=content):
+                request = {"content": content, "context": {}}
+                detected_type = self.kilocode_mcp._determine_creation_type(request)
+                
+                self.assertEqual(detected_type, expected_type)
+                print(f"   ✅ '{content}' → {expected_type.value}")
         
         print("✅ 创建类型检测全部正确")
     
-    async def async_test_ai_fallback_mechanism(self):
+    async def test_ai_fallback_mechanism(self):
         """测试AI兜底机制"""
         print("\n🎯 测试场景9: AI兜底机制")
         
-        # 测试AI协助失败的情况
-        self.mock_coordinator.send_request.return_value = {
-            "success": False,
-            "error": "AI服务不可用"
-        }
-        
+        # 测试AI协助失败的情况（内容命中AI_UNAVAILABLE_MARKER）
         request = {
             "content": "创建复杂的业务分析报告",
             "context": {"workflow_type": "requirements_analysis"}
@@ -250,13 +282,141 @@ class TestKiloCodeMCP(unittest.TestCase):
         self.assertEqual(result["created_by"], "kilocode_mcp")
         
         print("✅ AI失败时兜底机制正常工作")
+
+    async def test_ai_request_batching(self):
+        """测试coordinator批量提交"""
+        print("\n🎯 测试场景10: coordinator批量提交")
+        
+        coordinator = Mock()
+        coordinator.send_batch = AsyncMock(side_effect=lambda requests: [
+            {"success": True, "content": f"AI内容{i}"} for i in range(len(requests))
+        ])
+        kilocode_mcp = KiloCodeMCP(coordinator_client=coordinator, batch_ai_requests=True)
+        
+        requests = [
+            {"content": f"创建第{i}季度业务汇报PPT", "context": {"workflow_type": "requirements_analysis"}}
+            for i in range(3)
+        ]
+        results = await asyncio.gather(*[kilocode_mcp.process_request(r) for r in requests])
+        
+        # 三个并发请求只触发一次coordinator往返
+        self.assertEqual(coordinator.send_batch.await_count, 1)
+        self.assertEqual([r["content"] for r in results], ["AI内容0", "AI内容1", "AI内容2"])
+        self.assertTrue(all(r["ai_assisted"] for r in results))
+        
+        print("✅ 并发AI请求合并为单次批量提交")
+
+    def test_buffered_log_handler_flushes_after_interval(self):
+        """测试日志缓冲超过刷新间隔后写出"""
+        target = Mock()
+        handler = _BufferedLogHandler(capacity=64, target=target, flush_interval=60)
+        record = logging.LogRecord("kilocode_mcp", logging.INFO, __file__, 0, "msg", None, None)
+        
+        handler.handle(record)
+        target.handle.assert_not_called()
+        
+        handler._last_flush -= 60
+        handler.handle(record)
+        self.assertEqual(target.handle.call_count, 2)
+
+    async def test_single_ai_request_skips_batch_window(self):
+        """测试单个AI请求不等待批次窗口"""
+        coordinator = Mock()
+        coordinator.send_batch = AsyncMock(return_value=[{"success": True, "content": "AI内容"}])
+        kilocode_mcp = KiloCodeMCP(coordinator_client=coordinator, batch_ai_requests=True)
+        
+        request = {"content": "创建业务汇报PPT", "context": {"workflow_type": "requirements_analysis"}}
+        with patch("kilocode_mcp_redesigned._AI_BATCH_WINDOW", 60):
+            result = await asyncio.wait_for(kilocode_mcp.process_request(request), timeout=5)
+        
+        self.assertEqual(result["content"], "AI内容")
+        self.assertEqual(coordinator.send_batch.await_count, 1)
+
+    async def test_cancelled_request_does_not_drop_batch(self):
+        """测试批次中首个请求被取消时其余请求仍然得到结果"""
+        coordinator = Mock()
+        coordinator.send_batch = AsyncMock(side_effect=lambda requests: [
+            {"success": True, "content": f"AI内容{i}"} for i in range(len(requests))
+        ])
+        kilocode_mcp = KiloCodeMCP(coordinator_client=coordinator, batch_ai_requests=True)
+        
+        requests = [
+            {"content": f"创建第{i}季度业务汇报PPT", "context": {"workflow_type": "requirements_analysis"}}
+            for i in range(2)
+        ]
+        first, second = (asyncio.create_task(kilocode_mcp.process_request(r)) for r in requests)
+        await asyncio.sleep(0)
+        first.cancel()
+        
+        result = await second
+        self.assertEqual(result["content"], "AI内容1")
+        self.assertEqual(coordinator.send_batch.await_count, 1)
+        self.assertFalse(kilocode_mcp._ai_batch_tasks)
+
+    async def test_cancelled_request_does_not_drop_full_batch(self):
+        """测试填满批次的请求被取消时其余请求仍然得到结果"""
+        release = asyncio.Event()
+
+        async def send_batch(requests):
+            await release.wait()
+            return [{"success": True, "content": f"AI内容{i}"} for i in range(len(requests))]
+
+        coordinator = Mock()
+        coordinator.send_batch = AsyncMock(side_effect=send_batch)
+        kilocode_mcp = KiloCodeMCP(coordinator_client=coordinator, batch_ai_requests=True)
+
+        tasks = [
+            asyncio.create_task(kilocode_mcp.process_request(
+                {"content": f"创建第{i}季度业务汇报PPT", "context": {"workflow_type": "requirements_analysis"}}
+            ))
+            for i in range(16)
+        ]
+        await asyncio.sleep(0.01)
+        tasks[-1].cancel()
+        release.set()
+
+        results = await asyncio.wait_for(asyncio.gather(*tasks[:-1]), timeout=5)
+        self.assertEqual([r["content"] for r in results], [f"AI内容{i}" for i in range(15)])
+        self.assertEqual(coordinator.send_batch.await_count, 1)
+
+    async def test_batching_requires_opt_in(self):
+        """测试未启用批量提交时即使coordinator自动生成send_batch也逐个调用send_request"""
+        coordinator = AsyncMock()
+        coordinator.send_request.return_value = {"success": True, "content": "AI内容"}
+        kilocode_mcp = KiloCodeMCP(coordinator_client=coordinator)
+
+        result = await kilocode_mcp.process_request(
+            {"content": "创建业务汇报PPT", "context": {"workflow_type": "requirements_analysis"}}
+        )
+
+        self.assertTrue(result["ai_assisted"])
+        coordinator.send_batch.assert_not_awaited()
+
+        with self.assertRaises(ValueError):
+            KiloCodeMCP(coordinator_client=Mock(), batch_ai_requests=True)
+
+    async def test_batch_request_processing(self):
+        """测试批量请求处理"""
+        print("\n🎯 测试场景11: 批量请求处理")
+        
+        requests = [
+            {"content": "帮我做一个贪吃蛇游戏", "context": {}},
+            {"content": "创建自动化部署脚本", "context": {"workflow_type": "deployment_release"}},
+            {"content": "帮我做一个贪吃蛇游戏", "context": {}}
+        ]
+        results = await self.kilocode_mcp.process_requests(requests)
+        
+        self.assertEqual(
+            [r["type"] for r in results],
+            ["game_application", "deployment_script", "game_application"]
+        )
         
-        return result
+        print(f"✅ 批量处理完成: {len(results)} 个请求")
 
-class TestKiloCodeMCPIntegration(unittest.TestCase):
+class TestKiloCodeMCPIntegration(unittest.IsolatedAsyncioTestCase):
     """KiloCode MCP 集成测试"""
     
-    async def async_test_complete_workflow_simulation(self):
+    async def test_complete_workflow_simulation(self):
         """测试完整工作流模拟"""
         print("\n🎯 集成测试: 完整工作流模拟")
         
@@ -288,10 +448,13 @@ class TestKiloCodeMCPIntegration(unittest.TestCase):
         
         kilocode_mcp = KiloCodeMCP()
         
-        for scenario in scenarios:
+        # 各项目相互独立，并发处理
+        results = await asyncio.gather(
+            *(kilocode_mcp.process_request(scenario["request"]) for scenario in scenarios)
+        )
+        
+        for scenario, result in zip(scenarios, results):
             print(f"\n   📋 测试项目: {scenario['name']}")
-            result = await kilocode_mcp.process_request(scenario["request"])
-            
             self.assertTrue(result["success"])
             self.assertEqual(result["type"], scenario["expected_type"])
             
@@ -300,66 +463,28 @@ class TestKiloCodeMCPIntegration(unittest.TestCase):
         
         print("\n✅ 完整工作流模拟测试通过")
 
-async def run_all_tests():
-    """运行所有异步测试"""
-    print("🚀 开始KiloCode MCP测试")
-    print("=" * 60)
-    
-    # 单元测试
-    test_instance = TestKiloCodeMCP()
-    test_instance.setUp()
-    
-    # 运行所有异步测试
-    test_methods = [
-        test_instance.async_test_requirements_analysis_workflow,
-        test_instance.async_test_coding_implementation_workflow,
-        test_instance.async_test_architecture_design_workflow,
-        test_instance.async_test_testing_verification_workflow,
-        test_instance.async_test_deployment_release_workflow,
-        test_instance.async_test_monitoring_operations_workflow,
-        test_instance.async_test_workflow_type_detection,
-        test_instance.async_test_creation_type_detection,
-        test_instance.async_test_ai_fallback_mechanism
-    ]
+class TestKiloCodeCLI(unittest.IsolatedAsyncioTestCase):
+    """KiloCode MCP CLI接口测试"""
     
-    results = []
-    for test_method in test_methods:
-        try:
-            result = await test_method()
-            results.append(result)
-        except Exception as e:
-            print(f"❌ 测试失败: {test_method.__name__} - {str(e)}")
+    async def _run_cli(self, *args):
+        """以指定命令行参数运行CLI，返回标准输出"""
+        output = io.StringIO()
+        with patch.object(sys, "argv", ["kilocode_mcp_redesigned.py", *args]), redirect_stdout(output):
+            await cli_main()
+        return output.getvalue()
     
-    # 集成测试
-    integration_test = TestKiloCodeMCPIntegration()
-    await integration_test.async_test_complete_workflow_simulation()
-    
-    print("\n" + "=" * 60)
-    print("🎉 KiloCode MCP测试完成")
-    print(f"📊 测试结果: {len(results)} 个测试场景通过")
-    
-    return results
-
-def test_cli_interface():
-    """测试CLI接口"""
-    print("\n🎯 测试CLI接口")
+    async def test_cli_create(self):
+        """测试CLI create命令输出JSON结果"""
+        result = json.loads(await self._run_cli("create", "帮我做一个贪吃蛇游戏"))
+        
+        self.assertTrue(result["success"])
+        self.assertEqual(result["type"], "game_application")
+        self.assertEqual(result["created_by"], "kilocode_mcp")
     
-    # 这里可以测试命令行接口
-    print("✅ CLI接口测试通过")
+    async def test_cli_usage(self):
+        """测试CLI缺少命令或内容时的提示"""
+        self.assertIn("用法", await self._run_cli())
+        self.assertIn("请提供创建内容", await self._run_cli("create"))
 
 if __name__ == "__main__":
-    # 运行异步测试
-    results = asyncio.run(run_all_tests())
-    
-    # 运行CLI测试
-    test_cli_interface()
-    
-    print("\n🎯 测试总结:")
-    print(f"   ✅ 六大工作流兜底机制: 全部通过")
-    print(f"   ✅ 智能类型检测: 全部通过") 
-    print(f"   ✅ AI兜底机制: 全部通过")
-    print(f"   ✅ 集成测试: 全部通过")
-    print(f"   ✅ CLI接口: 全部通过")
-    
-    print("\n🎉 KiloCode MCP重新设计测试全部通过！")
-
+    unittest.main(verbosity=2)
@@ -4,11 +4,37 @@ PR Review Test Case - 验证自动化审查体系的价值
 模拟真实的PR review场景，展示自动化vs手工处理的差异
 """
 
+import asyncio
+import functools
 import json
-import requests
+import os
 import time
+import aiohttp
 from datetime import datetime
-from typing import Dict, Any
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 人工审查各阶段：(提示信息, 模拟耗时秒数, 发现的问题)
+MANUAL_REVIEW_PHASES = (
+    ("👨‍💻 人工审查员开始检查...", 2.0, ()),  # 阅读代码
+    ("🔍 检查架构合规性...", 3.0, ("发现直接MCP调用，违反架构规范",)),
+    ("🔒 检查安全问题...", 4.0, ("发现硬编码密码", "发现SQL注入风险")),
+    ("📝 检查代码风格...", 2.0, ("代码格式不规范",)),
+    ("📚 检查文档完整性...", 2.0, ("缺少函数文档",)),
+)
+
+# PR夹具中的文件内容存放在fixtures目录，首次使用时读取并缓存
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+@functools.cache
+def load_fixture(name: str) -> str:
+    """读取夹具文件内容"""
+    return (FIXTURES_DIR / name).read_text(encoding="utf-8")
 
 class PRReviewTestCase:
     """PR审查测试用例"""
@@ -28,55 +54,13 @@ class PRReviewTestCase:
             "files_changed": [
                 {
                     "path": "/mcp/adapter/user_auth_mcp/user_auth_mcp.py",
-                    "content": '''#!/usr/bin/env python3
-"""
-User Authentication MCP - 直接调用其他MCP (违反架构规范)
-"""
-
-import requests
-import hashlib
-
-# 硬编码密码 (安全问题)
-SECRET_KEY = "admin123456"
-DATABASE_PASSWORD = "root123"
-
-class UserAuthMCP:
-    def __init__(self):
-        # 直接调用其他MCP，违反中央协调原则
-        self.github_mcp = requests.get("http://localhost:8091")
-        self.operations_mcp = requests.get("http://localhost:8090")
-    
-    def authenticate_user(self,username,password):  # 代码风格问题：缺少空格
-        # 缺少文档说明
-        if username=="admin" and password==SECRET_KEY:  # 硬编码凭据
-            return True
-        return False
-    
-    def get_user_permissions(self, user_id):
-        # 直接调用MCP而不通过coordinator (架构违规)
-        response = requests.post("http://localhost:8090/api/permissions", 
-                               json={"user_id": user_id})
-        return response.json()
-    
-    # 缺少错误处理
-    def create_user(self, user_data):
-        sql = f"INSERT INTO users VALUES ('{user_data['name']}')"  # SQL注入风险
-        return self.execute_sql(sql)
-''',
+                    "content": load_fixture("user_auth_mcp.py.txt"),
                     "lines_added": 35,
                     "lines_deleted": 0
                 },
                 {
                     "path": "/mcp/adapter/user_auth_mcp/config.py",
-                    "content": '''# 配置文件也有问题
-API_KEY = "sk-1234567890abcdef"  # 硬编码API密钥
-DB_HOST = "localhost"
-DB_USER = "root"
-DB_PASS = "password123"  # 明文密码
-
-# 没有使用环境变量
-DEBUG = True  # 生产环境不应该开启debug
-''',
+                    "content": load_fixture("user_auth_config.py.txt"),
                     "lines_added": 8,
                     "lines_deleted": 0
                 }
@@ -102,64 +86,7 @@ DEBUG = True  # 生产环境不应该开启debug
             "files_changed": [
                 {
                     "path": "/mcp/adapter/logging_mcp/performance_optimizer.py",
-                    "content": '''#!/usr/bin/env python3
-"""
-Logging Performance Optimizer
-通过MCP Coordinator优化日志记录性能
-"""
-
-import os
-import logging
-from typing import Dict, Any, Optional
-from datetime import datetime
-
-class LoggingPerformanceOptimizer:
-    """日志性能优化器"""
-    
-    def __init__(self, coordinator_url: str):
-        """
-        初始化优化器
-        
-        Args:
-            coordinator_url: MCP协调器URL
-        """
-        self.coordinator_url = coordinator_url
-        self.api_key = os.getenv('LOGGING_API_KEY')  # 使用环境变量
-        self.logger = logging.getLogger(__name__)
-    
-    async def optimize_log_batch(self, log_entries: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """
-        批量优化日志条目
-        
-        Args:
-            log_entries: 日志条目列表
-            
-        Returns:
-            优化结果
-        """
-        try:
-            # 通过coordinator调用其他MCP
-            response = await self._call_coordinator(
-                "logging_processor_mcp",
-                "batch_process",
-                {"entries": log_entries}
-            )
-            
-            return {
-                "success": True,
-                "processed_count": len(log_entries),
-                "optimization_applied": True
-            }
-            
-        except Exception as e:
-            self.logger.error(f"日志优化失败: {e}")
-            return {"success": False, "error": str(e)}
-    
-    async def _call_coordinator(self, mcp_id: str, action: str, params: Dict[str, Any]) -> Dict[str, Any]:
-        """通过coordinator调用MCP"""
-        # 正确的MCP通信方式
-        pass
-''',
+                    "content": load_fixture("logging_performance_optimizer.py.txt"),
                     "lines_added": 45,
                     "lines_deleted": 12
                 }
@@ -181,33 +108,17 @@ class LoggingPerformanceOptimizer:
         print("🔴 手工审查场景 - 没有自动化体系")
         print("="*60)
         
-        start_time = time.time()
-        
-        # 模拟人工审查过程
+        # 模拟人工审查过程：按阶段累计耗时，只有演示模式才真正等待
+        demo_mode = os.getenv("DEMO_MODE")
         manual_issues = []
+        manual_time = 0.0
         
-        print("👨‍💻 人工审查员开始检查...")
-        time.sleep(2)  # 模拟阅读代码时间
-        
-        print("🔍 检查架构合规性...")
-        time.sleep(3)
-        manual_issues.append("发现直接MCP调用，违反架构规范")
-        
-        print("🔒 检查安全问题...")
-        time.sleep(4)
-        manual_issues.append("发现硬编码密码")
-        manual_issues.append("发现SQL注入风险")
-        
-        print("📝 检查代码风格...")
-        time.sleep(2)
-        manual_issues.append("代码格式不规范")
-        
-        print("📚 检查文档完整性...")
-        time.sleep(2)
-        manual_issues.append("缺少函数文档")
-        
-        end_time = time.time()
-        manual_time = end_time - start_time
+        for message, cost_seconds, issues in MANUAL_REVIEW_PHASES:
+            print(message)
+            if demo_mode:
+                time.sleep(cost_seconds)
+            manual_time += cost_seconds
+            manual_issues.extend(issues)
         
         result = {
             "scenario": "manual_review",
@@ -226,8 +137,15 @@ class LoggingPerformanceOptimizer:
         
         return result
     
-    def test_automated_review_scenario(self) -> Dict[str, Any]:
-        """测试自动化审查场景 - 展示自动化的优势"""
+    async def test_automated_review_scenario(self, session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
+        """测试自动化审查场景 - 展示自动化的优势
+        
+        未传入session时自行创建一个，传入时复用调用方（如健康检查）的连接。
+        """
+        if session is None:
+            async with aiohttp.ClientSession() as session:
+                return await self.test_automated_review_scenario(session)
+        
         print("\n" + "="*60)
         print("🟢 自动化审查场景 - 有自动化体系")
         print("="*60)
@@ -240,15 +158,17 @@ class LoggingPerformanceOptimizer:
         print("🤖 启动自动化审查流程...")
         
         try:
-            # 调用可配置审查工作流
-            response = requests.post(
+            # 调用可配置审查工作流（复用健康检查的连接）
+            async with session.post(
                 f"{self.configurable_review_url}/api/review/process",
                 json=pr_data,
-                timeout=30
-            )
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                status = response.status
+                # 不校验Content-Type，与requests的response.json()行为一致
+                result = await response.json(content_type=None) if status == 200 else None
             
-            if response.status_code == 200:
-                result = response.json()
+            if status == 200:
                 end_time = time.time()
                 automated_time = end_time - start_time
                 
@@ -269,14 +189,14 @@ class LoggingPerformanceOptimizer:
                     "result": result
                 }
             else:
-                print(f"❌ 自动化审查失败: {response.status_code}")
+                print(f"❌ 自动化审查失败: {status}")
                 return {"scenario": "automated_review", "success": False}
                 
         except Exception as e:
             print(f"❌ 自动化审查异常: {e}")
             return {"scenario": "automated_review", "success": False, "error": str(e)}
     
-    def compare_scenarios(self) -> Dict[str, Any]:
+    async def compare_scenarios(self, session: Optional[aiohttp.ClientSession] = None) -> Dict[str, Any]:
         """对比两种场景"""
         print("\n" + "="*80)
         print("📊 手工 vs 自动化审查对比分析")
@@ -286,7 +206,7 @@ class LoggingPerformanceOptimizer:
         manual_result = self.test_manual_review_scenario()
         
         # 测试自动化审查
-        automated_result = self.test_automated_review_scenario()
+        automated_result = await self.test_automated_review_scenario(session)
         
         # 对比分析
         print("\n" + "="*60)
@@ -316,7 +236,12 @@ class LoggingPerformanceOptimizer:
                 "recommendation": "需要修复自动化系统"
             }
     
-    def run_comprehensive_test(self):
+    async def _check_service(self, session: aiohttp.ClientSession, url: str) -> bool:
+        """检查单个服务的健康状态"""
+        async with session.get(f"{url}/health", timeout=aiohttp.ClientTimeout(total=5)) as response:
+            return response.status == 200
+    
+    async def run_comprehensive_test(self):
         """运行综合测试"""
         print("🚀 开始PR审查自动化体系测试")
         print("目标：证明自动化体系的价值，避免每天忙于处理重复问题")
@@ -329,18 +254,23 @@ class LoggingPerformanceOptimizer:
             ("MCP协调器", self.coordinator_url)
         ]
         
-        for name, url in services:
-            try:
-                response = requests.get(f"{url}/health", timeout=5)
-                if response.status_code == 200:
+        async with aiohttp.ClientSession() as session:
+            # 并发检查所有服务，总耗时取决于最慢的一个
+            health_results = await asyncio.gather(
+                *(self._check_service(session, url) for _, url in services),
+                return_exceptions=True
+            )
+            
+            for (name, _), healthy in zip(services, health_results):
+                if isinstance(healthy, Exception):
+                    print(f"❌ {name}: 无法连接")
+                elif healthy:
                     print(f"✅ {name}: 运行正常")
                 else:
                     print(f"⚠️  {name}: 状态异常")
-            except:
-                print(f"❌ {name}: 无法连接")
-        
-        # 运行对比测试
-        comparison_result = self.compare_scenarios()
+            
+            # 运行对比测试
+            comparison_result = await self.compare_scenarios(session)
         
         # 生成报告
         self.generate_test_report(comparison_result)
@@ -364,18 +294,21 @@ class LoggingPerformanceOptimizer:
         
         # 保存报告
         report_path = "/home/ubuntu/kilocode_integrated_repo/test_reports/pr_review_automation_test_report.json"
-        import os
         os.makedirs(os.path.dirname(report_path), exist_ok=True)
         
-        with open(report_path, 'w', encoding='utf-8') as f:
-            json.dump(report, f, ensure_ascii=False, indent=2)
+        if orjson is not None:
+            with open(report_path, 'wb') as f:
+                f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+        else:
+            with open(report_path, 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
         
         print(f"\n📄 测试报告已保存: {report_path}")
 
 if __name__ == "__main__":
     # 运行测试
     test_case = PRReviewTestCase()
-    result = test_case.run_comprehensive_test()
+    result = asyncio.run(test_case.run_comprehensive_test())
     
     print("\n" + "="*80)
     print("🎉 测试完成！自动化体系价值已验证")